@@ -29,5 +29,5 @@ bc.add_tx(tx)
 #  mine 
 # --------
 blk = bc.mine_block(miner_addr=pubA)
-print("Mined block", blk.hash[:16], "height", blk.index)
-print("Balances: ", bc.accounts[pubA]["balance"], "/", bc.accounts[pubB]["balance"])
+print("Mined block", blk.hash.hex()[:16], "height", blk.index)
+print("Balances: ", bc.accounts[pubA].balance, "/", bc.accounts[pubB].balance)
@@ -1,8 +1,10 @@
 # send_tx.py
 
+import argparse
 import asyncio
 import json
 import websockets
+from src.pychain.config import WS_MAX_SIZE, WS_WRITE_LIMIT
 from src.pychain.transaction import Transaction, gen_keypair
 import os
 
@@ -27,7 +29,28 @@ def load_or_create_wallet():
     return priv, pub
 
 
-async def main():
+# Txs per "tx_batch" frame; the node relays accepted ones in batches too
+BATCH_SIZE = 64
+
+
+def sign_batch(priv: str, pub: str, nonces: range) -> list[dict]:
+    """ Build & sign one batch of trivial TXs (sending to self for simplicity) """
+    batch = []
+    for nonce in nonces:
+        tx = Transaction(
+            tx_type="PAY",
+            sender=pub,
+            recipient=pub,
+            amount=1_000_000,
+            fee=0,
+            nonce=nonce,
+        )
+        tx.sign(priv)
+        batch.append(tx.to_dict())
+    return batch
+
+
+async def main(count: int = 1):
     # 1) Generate a fresh wallet for this demo
     priv, pub = load_or_create_wallet()
     print(f"  New demo wallet:\n  PUB (fund this on each node):\n  {pub}\n")
@@ -35,22 +58,29 @@ async def main():
     # BEFORE running this script, in each P2P node’s REPL do:
     #    node.blockchain.accounts[pub] = {"balance": 50_000_000, "nonce": 0, "stake": 0}
 
-    # 2) Build & sign a trivial TX (sending to self for simplicity)
-    tx = Transaction(
-        tx_type="PAY",
-        sender=pub,
-        recipient=pub,
-        amount=1_000_000,
-        fee=0,
-        nonce=1,
-    )
-    tx.sign(priv)
-
-    # 3) Broadcast it to Node A (ws://localhost:8000)
-    msg = json.dumps({"type": "tx", "payload": tx.to_dict()})
-    async with websockets.connect("ws://localhost:8000") as ws:
-        await ws.send(msg)
-        print("Transaction broadcast to ws://localhost:8000")
+    # 2) Sign `count` TXs (nonces 1..count) batch by batch in a worker thread, so
+    #    ECDSA never blocks the event loop and batch k+1 is signed while batch k
+    #    is on the wire
+    batches = [range(lo, min(lo + BATCH_SIZE, count + 1)) for lo in range(1, count + 1, BATCH_SIZE)]
+    signing = asyncio.create_task(asyncio.to_thread(sign_batch, priv, pub, batches[0]))
+
+    # 3) Broadcast them to Node A (ws://localhost:8000) over one connection,
+    #    BATCH_SIZE per frame instead of a handshake and a frame per tx
+    async with websockets.connect("ws://localhost:8000", max_size=WS_MAX_SIZE, write_limit=WS_WRITE_LIMIT) as ws:
+        for i in range(len(batches)):
+            txs = await signing
+            if i + 1 < len(batches):
+                signing = asyncio.create_task(asyncio.to_thread(sign_batch, priv, pub, batches[i + 1]))
+            if count == 1:
+                await ws.send(json.dumps({"type": "tx", "payload": txs[0]}))
+            else:
+                await ws.send(json.dumps({"type": "tx_batch", "payload": txs}))
+        print(f"{count} transaction(s) broadcast to ws://localhost:8000")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1, help="number of txs to send (nonces 1..count)")
+    args = parser.parse_args()
+    if args.count < 1:
+        parser.error("--count must be at least 1")
+    asyncio.run(main(args.count))
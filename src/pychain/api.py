@@ -1,14 +1,79 @@
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Optional
+import orjson
 import uvicorn
 
-from src.pychain.blockchain import Blockchain
+from src.pychain.blockchain import Account, Blockchain
 from src.pychain.transaction import Transaction
 
+class FastJSONResponse(JSONResponse):
+    ''' orjson-rendered JSON; chain objects serialize through their to_dict(). '''
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_to_dict)
+
+def _to_dict(obj: Any) -> dict:
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+class _ReadCache:
+    ''' Pre-serialized /block and /chain bodies. Blocks never change once on the
+    chain, so entries stay valid until the chain is replaced underneath them.
+
+    Sync endpoints run in FastAPI's threadpool, so nothing here is edited in place:
+    a caller builds from a snapshot and publishes the result with one assignment.
+    A reader sees either the old or the new state, and a lost race only costs a
+    rebuild. '''
+
+    def __init__(self):
+        self.source = None                  # chain list the entries were built from
+        self.blocks: dict[bytes, bytes] = {}  # block hash -> /block body
+        # (height, tip hash, '"h0","h1",...' for the first `height` blocks)
+        self.hashes: tuple[int, bytes, bytes] = (0, b"", b"")
+
+    def sync(self, blocks) -> None:
+        ''' replace_chain swaps in a new list; drop bodies built from the old one. '''
+        if blocks is not self.source:
+            self.blocks = {}
+            self.hashes = (0, b"", b"")
+            self.source = blocks
+
+    def block_json(self, blk) -> bytes:
+        blocks = self.blocks
+        body = blocks.get(blk.hash)
+        if body is None:
+            body = blocks[blk.hash] = orjson.dumps({
+                "index": blk.index,
+                "prev": blk.previous_hash.hex(),
+                "timestamp": blk.timestamp,
+                "transactions": [tx.hash() for tx in blk.transactions],
+                "nonce": blk.nonce,
+                "hash": blk.hash.hex(),
+            })
+        return body
+
+    def chain_json(self, blocks) -> bytes:
+        self.sync(blocks)
+        height, tip, body = self.hashes
+        n = len(blocks)                     # a concurrent mine_block may append meanwhile
+        # Start over if our cached tip is no longer part of the chain (pop/replace)
+        if height > n or (height and blocks[height - 1].hash != tip):
+            height, tip, body = 0, b"", b""
+        if height < n:
+            new = blocks[height:n]
+            suffix = b",".join([orjson.dumps(blk.hash.hex()) for blk in new])
+            body = body + b"," + suffix if height else suffix
+            self.hashes = (n, new[-1].hash, body)
+        return b"[" + body + b"]"
+
+_read_cache = _ReadCache()
+
 # Instantiate one shared chain (in-memory)
 chain = Blockchain(use_pos=False, enable_reward=True)
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Pydantic models for request bodies
 class FaucetReq(BaseModel):
@@ -29,7 +94,7 @@ class TxReq(BaseModel):
 
 @app.post("/faucet")
 def faucet(req: FaucetReq):
-    chain.accounts[req.address] = {"balance": req.amount, "nonce": 0, "stake": 0}
+    chain.accounts[req.address] = Account(balance=req.amount)
     return {"status": "ok", "funded": req.address, "amount": req.amount}
 
 @app.post("/tx")
@@ -63,32 +128,27 @@ def mine(miner: str = Query(..., description="Miner address to recieive rewards"
     blk = chain.mine_block(miner_addr=miner)
     if blk is None:
         raise HTTPException(status_code=400, detail="Nothing to mine or not validator")
-    return {"status": "mined", "block": blk.compute_hash(), "height": blk.index}
+    return {"status": "mined", "block": blk.hash.hex(), "height": blk.index}
 
 @app.get("/balance/{addr}")
 def balance(addr: str):
     acct = chain.accounts.get(addr)
     if acct is None:
         return {"address": addr, "balance": 0}
-    return {"address": addr, "balance": acct["balance"], "stake": acct["stake"], "nonce": acct["nonce"]}
+    return {"address": addr, "balance": acct.balance, "stake": acct.stake, "nonce": acct.nonce}
 
 @app.get("/block/{height}")
 def get_block(height: int):
-    if height < 0 or height >= len(chain.chain):
+    blocks = chain.chain                  # one snapshot, in case replace_chain swaps it
+    if height < 0 or height >= len(blocks):
         raise HTTPException(status_code=404, detail="Block not found")
-    blk = chain.chain[height]
-    return {
-        "index": blk.index,
-        "prev": blk.previous_hash,
-        "timestamp": blk.timestamp,
-        "transactions": [tx.hash() for tx in blk.transactions],
-        "nonce": blk.nonce,
-        "hash": blk.hash,
-    }
+    blk = blocks[height]
+    _read_cache.sync(blocks)
+    return Response(_read_cache.block_json(blk), media_type="application/json")
 
 @app.get("/chain")
-def get_chain() -> List[str]:
-    return [blk.hash for blk in chain.chain]
+def get_chain():
+    return Response(_read_cache.chain_json(chain.chain), media_type="application/json")
 
 # --- Run using: uvicorn api:app --reload --port 5000 ---  
 if __name__ == "__main__":
@@ -1,75 +1,185 @@
 from dataclasses import dataclass, field
 from typing import List
-import hashlib, json, time
-from src.pychain.config import JSON_SEP
+import hashlib, struct, time
+from src.pychain.config import MERKLE_HASH
 from src.pychain.transaction import Transaction
 
 
-def merkle_root(tx_hashes: list[str]) -> str:
+# Fixed binary header: index | prev hash | timestamp | merkle root | nonce
+# The nonce goes last so PoW can hash the constant prefix once (see _search_nonce).
+HEADER_FMT   = "<Q32sQ32sQ"
+NONCE_OFFSET = struct.calcsize("<Q32sQ32s")
+_HEADER      = struct.Struct(HEADER_FMT)   # format parsed once, not per hash
 
-    ''' small, non-optimized Merkle tree '''
+
+def _timestamp_ns(ts: int | float) -> int:
+    ''' Older blocks carry float seconds; headers hash integer nanoseconds. '''
+    if isinstance(ts, float):
+        return round(ts * 1_000_000_000)
+    return ts
+
+
+# Merkle node hash, selected by config; the header reserves 32 bytes for the root
+_node_hash = getattr(hashlib, MERKLE_HASH)
+if _node_hash().digest_size != 32:
+    raise ValueError(f"MERKLE_HASH {MERKLE_HASH!r} must produce a 32-byte digest")
+_NODE_TEMPLATE = _node_hash()
+
+
+# index, timestamp and nonce are packed as unsigned 64-bit header fields
+_U64_MAX = (1 << 64) - 1
+
+
+def _u64(value, name: str) -> int:
+    ''' Header int from the wire; anything _HEADER.pack would refuse raises ValueError. '''
+    if type(value) is not int or not 0 <= value <= _U64_MAX:
+        raise ValueError(f"block {name} must be an int in [0, 2**64): {value!r}")
+    return value
+
+
+# Parent of the genesis block
+GENESIS_PREV = bytes(32)
+
+
+def _from_hex(value: str) -> bytes:
+    ''' Wire hex -> raw digest; "" stays empty and a short "0" parent pads to zeros.
+    Anything that is not at most 64 hex digits raises ValueError. '''
+    if not isinstance(value, str) or len(value) > 64:
+        raise ValueError(f"not a 32-byte hex digest: {value!r}")
+    if not value:
+        return b""
+    return bytes.fromhex(value.rjust(64, "0"))
+
+
+def merkle_root(tx_hashes: list[bytes]) -> bytes:
+
+    ''' Merkle tree over raw 32-byte digests; each node hashes a 64-byte pair. '''
 
     if not tx_hashes:
-        return hashlib.sha256(b"").hexdigest()
+        return _node_hash(b"").digest()
 
-    layer = tx_hashes
+    fresh = _NODE_TEMPLATE.copy
+    # A list of separate digests measured faster than one bytearray walked with
+    # memoryview slices: slicing per update costs more than the appends it saves.
+    layer = list(tx_hashes)
     while len(layer) > 1:
         if len(layer) % 2:            # odd -> duplicate last
             layer.append(layer[-1])
-        layer = [
-            hashlib.sha256((layer[i] + layer[i + 1]).encode()).hexdigest()
-            for i in range(0, len(layer), 2)
-        ]
+        pairs = iter(layer)           # zip(it, it) yields (left, right) pairs
+        parents = []
+        for left, right in zip(pairs, pairs):
+            h = fresh()               # copy of a ready context, no per-node init
+            h.update(left)            # two updates instead of allocating left + right
+            h.update(right)
+            parents.append(h.digest())
+        layer = parents
     return layer[0]
 
 
-@dataclass()
+class MerkleFrontier:
+
+    ''' Streaming Merkle builder for a growing tx list. Keeps at most one finished
+    subtree root per level (log N nodes), so each append costs O(log N) and
+    root() equals merkle_root() over the same leaves. '''
+
+    def __init__(self) -> None:
+        self.peaks: list[bytes | None] = []   # peaks[level] covers 2**level leaves
+        self.count = 0
+
+    def append(self, leaf: bytes) -> None:
+        node = leaf
+        for level, peak in enumerate(self.peaks):
+            if peak is None:
+                self.peaks[level] = node
+                break
+            node = _node_hash(peak + node).digest()
+            self.peaks[level] = None
+        else:
+            self.peaks.append(node)
+        self.count += 1
+
+    def copy(self) -> "MerkleFrontier":
+        clone = MerkleFrontier()
+        clone.peaks = list(self.peaks)
+        clone.count = self.count
+        return clone
+
+    def root(self) -> bytes:
+        if not self.count:
+            return _node_hash(b"").digest()
+        top = len(self.peaks) - 1
+        carry = None                          # partial right-edge node climbing up
+        for level, peak in enumerate(self.peaks):
+            if peak is None:
+                if carry is not None:         # lone node on an odd layer -> duplicate
+                    carry = _node_hash(carry + carry).digest()
+            elif carry is None:
+                if level == top:
+                    return peak
+                carry = _node_hash(peak + peak).digest()
+            else:
+                carry = _node_hash(peak + carry).digest()
+        return carry
+
+
+@dataclass(slots=True)
 class Block:
+    ''' Digests (previous_hash, merkle_root, hash) are raw 32-byte values;
+    they are hex-encoded only in to_dict()/from_dict() and the API. '''
     index: int
-    previous_hash: str
-    timestamp: float = field(default_factory=time.time)
+    previous_hash: bytes
+    timestamp: int = field(default_factory=time.time_ns)   # unix time in nanoseconds
     transactions: List[Transaction] = field(default_factory=list)
     nonce: int = 0
-    merkle_root: str = ""
-    hash: str = ""
+    merkle_root: bytes = b""
+    hash: bytes = b""
 
     
     
-    def compute_hash(self) -> str:
-        computed_root = merkle_root([tx.hash() for tx in self.transactions])
-        block_dict = {
-            "idx": self.index,
-            "prev": self.previous_hash,
-            "ts": self.timestamp,
-            "nonce": self.nonce,
-            "mrkl": computed_root,
-        }
-        block_json = json.dumps(block_dict, sort_keys=True, separators=JSON_SEP)
-        return hashlib.sha256(block_json.encode()).hexdigest()
+    def compute_hash(self, root: bytes = b"") -> bytes:
+        return hashlib.sha256(self.header_bytes(root)).digest()
+
+    def header_bytes(self, root: bytes = b"") -> bytes:
+        ''' Packed header that gets hashed; the nonce sits at NONCE_OFFSET.
+        Validators pass the root they already computed so the tree isn't rebuilt. '''
+        # Reuse the root fixed at assembly time; validators check it against the txs first.
+        computed_root = root or self.merkle_root or merkle_root([tx.hash_bytes() for tx in self.transactions])
+        return _HEADER.pack(
+            self.index,
+            self.previous_hash,
+            self.timestamp,
+            computed_root,
+            self.nonce,
+        )
 
 
     def to_dict(self) -> dict:
         return {
             "index": self.index,
-            "previous_hash": self.previous_hash,
+            "previous_hash": self.previous_hash.hex(),
             "timestamp": self.timestamp,
             "transactions": [tx.to_dict() for tx in self.transactions],
             "nonce": self.nonce,
-            "merkle_root": self.merkle_root,
-            "hash": self.hash,
+            "merkle_root": self.merkle_root.hex(),
+            "hash": self.hash.hex(),
         }
     
 
     @classmethod
     def from_dict(cls, data: dict):
-        txs = [Transaction.from_dict(t) for t in data["transactions"]]
-        blk = cls(
-            index=data["index"],
-            previous_hash=data["previous_hash"],
-            timestamp=data["timestamp"],
-            transactions=txs,
-            nonce=data["nonce"],
-            merkle_root=data["merkle_root"],
-            hash=data["hash"],
-        )
+        ''' Wire dict -> Block. Peers send these, so a malformed block raises
+        ValueError here instead of failing later inside validation. '''
+        try:
+            txs = [Transaction.from_dict(t) for t in data["transactions"]]
+            blk = cls(
+                index=_u64(data["index"], "index"),
+                previous_hash=_from_hex(data["previous_hash"]),
+                timestamp=_u64(_timestamp_ns(data["timestamp"]), "timestamp"),
+                transactions=txs,
+                nonce=_u64(data["nonce"], "nonce"),
+                merkle_root=_from_hex(data["merkle_root"]),
+                hash=_from_hex(data["hash"]),
+            )
+        except (KeyError, TypeError, OverflowError) as e:
+            raise ValueError(f"malformed block: {e!r}") from e
         return blk
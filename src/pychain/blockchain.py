@@ -25,12 +25,25 @@ Things To Add                              Status
 
 from __future__ import annotations
 
+import bisect
 import hashlib
+import hmac
+import itertools
+import os
+import struct
+import threading
+from collections import ChainMap, Counter, OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
 from dataclasses import dataclass, replace
-from typing import Dict, List
+from functools import partial
+from operator import attrgetter
+from typing import Callable, Dict, List, Mapping, MutableMapping
 
-from src.pychain.block import Block, merkle_root
-from src.pychain.config import BLOCK_REWARD, DIFFICULTY, STAKE_REWARD_PCT, REWARD_SENDER, REWARD_SIGNATURE
+from src.pychain.block import GENESIS_PREV, NONCE_OFFSET, Block, MerkleFrontier, merkle_root
+from src.pychain.config import (
+    BLOCK_REWARD, DIFFICULTY, MAX_AMOUNT, STAKE_REWARD_PCT, REWARD_SENDER, REWARD_SIGNATURE,
+    MINING_PROCESSES, PARALLEL_CHECK_MIN, PARALLEL_VERIFY_MIN, POW_SPAN, VERIFY_CACHE_SIZE,
+)
 
 from src.pychain.transaction import Transaction
 
@@ -39,52 +52,325 @@ from src.pychain.transaction import Transaction
 # -----------------------------------------------------------------------------#
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Remittance:
     id: str
     sender: str
     recipient: str
     amount: int
-    release_hash: str
+    release_hash: bytes     # raw SHA-256 of the release code
     released: bool = False
 
 
+def _is_hex_digest(value: object) -> bool:
+    ''' True for a 64-char hex string, i.e. a SHA-256 digest on the wire. '''
+    if not isinstance(value, str) or len(value) != 64:
+        return False
+    try:
+        bytes.fromhex(value)
+    except ValueError:
+        return False
+    return True
+
+
+# -----------------------------------------------------------------------------#
+#   Account ledger rows
+# -----------------------------------------------------------------------------#
+
+
+@dataclass(slots=True)
+class Account:
+    ''' One address's balance/nonce/stake as a compact slotted record.
+    Item access (acct["balance"]) still works for older callers. '''
+    balance: int = 0
+    nonce: int = 0
+    stake: int = 0
+
+    def __getitem__(self, key: str) -> int:
+        if key not in Account.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: int) -> None:
+        if key not in Account.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def copy(self) -> Account:
+        return Account(self.balance, self.nonce, self.stake)
+
+
+class AccountTable(dict):
+    ''' address -> Account; plain {"balance", "nonce", "stake"} dicts assigned
+    by faucets/tests are converted to Account rows on the way in. '''
+
+    def __setitem__(self, addr: str, acct: Account | Mapping[str, int]) -> None:
+        if not isinstance(acct, Account):
+            acct = Account(**acct)
+        super().__setitem__(addr, acct)
+
+
+# -----------------------------------------------------------------------------#
+#   Replay target
+# -----------------------------------------------------------------------------#
+
+@dataclass(slots=True)
+class _Ledger:
+    ''' Where a block replay reads and writes: the live ledger when applying, or
+    scratch copies when validating. `accounts` is the stake view used to check
+    slash evidence. '''
+    acct: Callable[[str], Account]
+    remits: MutableMapping[str, Remittance]
+    accounts: Mapping[str, Account]
+    validate: bool
+
+
+# -----------------------------------------------------------------------------#
+#   Parallel chain checks
+# -----------------------------------------------------------------------------#
+
+def _verify_chunk(txs: List[Transaction]) -> List[bool]:
+    ''' Worker-side tx.verify(); module-level so the process pool can pickle it. '''
+    return [tx.verify() for tx in txs]
+
+
+def _structural_check(blk: Block, use_pos: bool) -> tuple[bool, bytes]:
+    ''' Checks on one block that need no ledger state (PoW target, Merkle root,
+    header hash). Returns (ok, computed Merkle root). '''
+    computed = merkle_root([tx.hash_bytes() for tx in blk.transactions])
+    ok = (
+        (use_pos or _meets_target(blk.hash))
+        and (not blk.merkle_root or blk.merkle_root == computed)
+        and blk.hash == blk.compute_hash(computed)
+    )
+    return ok, computed
+
+
+# -----------------------------------------------------------------------------#
+#   PoS seeds
+# -----------------------------------------------------------------------------#
+
+def _fast_hash(data: bytes) -> str:
+    ''' Digest for node-internal values (validator-selection seeds). Not part of any
+    client-facing format, so it uses BLAKE2b; remittance codes stay SHA-256. '''
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+# -----------------------------------------------------------------------------#
+#   PoW nonce search
+# -----------------------------------------------------------------------------#
+
+
+# A hash meets DIFFICULTY (that many leading hex zeros) iff, read as a 256-bit
+# big-endian integer, it is below this bound
+POW_TARGET = 1 << (256 - 4 * DIFFICULTY)
+
+
+def _meets_target(digest: bytes) -> bool:
+    return int.from_bytes(digest, "big") < POW_TARGET
+
+
+def _search_nonce(
+    prefix: bytes,
+    target: int,
+    start: int,
+    stop: int | None = None,
+    _pack_nonce=struct.Struct("<Q").pack,
+    _from_bytes=int.from_bytes,
+) -> tuple[int, bytes] | None:
+    ''' Try nonces from ``start`` (up to ``stop``, if given) until the header
+    hash is below ``target``; None if the range holds no such nonce.
+
+    ``prefix`` is every header byte before the trailing nonce. It is absorbed
+    once into a SHA-256 midstate; each try copies that state and feeds only the
+    8 nonce bytes, so the constant first compression block is never redone. '''
+    midstate = hashlib.sha256(prefix)
+    resume = midstate.copy
+    for nonce in itertools.count(start) if stop is None else range(start, stop):
+        h = resume()
+        h.update(_pack_nonce(nonce))
+        digest = h.digest()
+        if _from_bytes(digest, "big") < target:     # no hex encoding per try
+            return nonce, digest
+    return None
+
+
+def _parallel_search(
+    prefix: bytes, target: int, start: int, workers: int, stop: threading.Event | None = None,
+) -> tuple[int, bytes] | None:
+    ''' _search_nonce across `workers` processes. The nonce space is cut into
+    POW_SPAN-sized ranges handed out in order; the lowest hit among finished
+    ranges wins and queued ranges are cancelled. Once ``stop`` is set, queued
+    ranges are cancelled too and None is returned after the running ones end. '''
+    spans = itertools.count(start, POW_SPAN)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def submit():
+            lo = next(spans)
+            return pool.submit(_search_nonce, prefix, target, lo, lo + POW_SPAN)
+
+        running = {submit() for _ in range(2 * workers)}   # keep every worker busy
+        while True:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            hits = [hit for hit in (fut.result() for fut in done) if hit is not None]
+            if hits or (stop is not None and stop.is_set()):
+                for fut in running:
+                    fut.cancel()
+                return min(hits) if hits else None
+            running |= {submit() for _ in done}
+
+
+def _serial_search(prefix: bytes, target: int, start: int, stop: threading.Event) -> tuple[int, bytes] | None:
+    ''' _search_nonce in POW_SPAN steps, giving up between steps once ``stop`` is set. '''
+    for lo in itertools.count(start, POW_SPAN):
+        if stop.is_set():
+            return None
+        hit = _search_nonce(prefix, target, lo, lo + POW_SPAN)
+        if hit is not None:
+            return hit
+
+
+TX_TYPES = frozenset({"PAY", "OPEN_REMIT", "CLAIM_REMIT", "STAKE", "UNSTAKE", "SLASH"})
+
+_fee = attrgetter("fee")   # C-level getter for fee sums over block txs
+
+
 # -----------------------------------------------------------------------------#
 #   Blockchain
 # -----------------------------------------------------------------------------#
 
 
 class Blockchain:
-    def __init__(self, use_pos: bool = False, enable_reward: bool = False):
+    def __init__(self, use_pos: bool = False, enable_reward: bool = False) -> None:
         self.chain: List[Block] = []
         self.pending: List[Transaction] = []
-        # account -> {"balance": int, "nonce": int, "stake": int}
-        self.accounts: Dict[str, Dict[str, int]] = {}
+        # Merkle frontier, fee total and per-address stake change over `pending`, grown in add_tx
+        self._frontier = MerkleFrontier()
+        self._pending_fees: int = 0
+        self._pending_stake: Dict[str, int] = {}
+        # address -> Account(balance, nonce, stake)
+        self.accounts: AccountTable = AccountTable()
         # NEW: id -> Remittance
         self.remits: Dict[str, Remittance] = {}
-        self.use_pos = use_pos
-        self.enable_reward = enable_reward
+        self.use_pos: bool = use_pos
+        self.enable_reward: bool = enable_reward
         self.create_genesis_block()
         self._last_signed: Dict[str, int] = {}
+        # blake2b(sig || pubkey || tx hash) -> verify() result, LRU-bounded
+        self._verify_cache: OrderedDict[bytes, bool] = OrderedDict()
 
     # ---------------------------------------------------------------------#
     #  Helpers
     # ---------------------------------------------------------------------#
 
-    def _get_acct(self, addr: str) -> Dict[str, int]:
-        ''' Return (or create) the per-address balance/nonce/stake dict. '''
-        return self.accounts.setdefault(addr, {"balance": 0, "nonce": 0, "stake": 0})
+    def _get_acct(self, addr: str) -> Account:
+        ''' Return (or create) the per-address balance/nonce/stake record. '''
+        acct = self.accounts.get(addr)
+        if acct is None:
+            acct = self.accounts[addr] = Account()
+        return acct
     
     def _is_reward_tx(self, tx: Transaction) -> bool:
+        # Signature first: it is the field that tells user txs apart, so they
+        # fail on the first compare instead of passing the tx_type == "PAY" test.
         return (
-            tx.tx_type == "PAY" 
+            tx.signature == REWARD_SIGNATURE
             and tx.sender == REWARD_SENDER
-            and tx.signature == REWARD_SIGNATURE
+            and tx.tx_type == "PAY"
             )
 
+    def _split_rewards(self, tx_list: List[Transaction]) -> tuple[List[Transaction], List[Transaction]]:
+        ''' One pass over a block's txs -> (reward txs, user txs). '''
+        rewards: List[Transaction] = []
+        users: List[Transaction] = []
+        is_reward = self._is_reward_tx
+        for tx in tx_list:
+            (rewards if is_reward(tx) else users).append(tx)
+        return rewards, users
+
     def _total_fees(self, tx_list: List[Transaction]) -> int:
-        return sum(tx.fee for tx in tx_list if not self._is_reward_tx(tx))
+        return sum(map(_fee, itertools.filterfalse(self._is_reward_tx, tx_list)))
     
+    @staticmethod
+    def _verify_key(tx: Transaction) -> bytes:
+        return hashlib.blake2b(
+            tx.signature.encode() + tx.sender.encode() + tx.hash_bytes(), digest_size=16
+        ).digest()
+
+    def _remember_verify(self, key: bytes, ok: bool) -> None:
+        cache = self._verify_cache
+        cache[key] = ok
+        if len(cache) > VERIFY_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def _verify_cached(self, tx: Transaction) -> bool:
+        ''' tx.verify(), but each (signature, pubkey, tx hash) is only checked once:
+        txs verified at mempool admission are not re-verified when mined/validated. '''
+        if tx.signature is None:
+            return False
+        key = self._verify_key(tx)
+        ok = self._verify_cache.get(key)
+        if ok is None:
+            ok = tx.verify()
+            self._remember_verify(key, ok)
+        else:
+            self._verify_cache.move_to_end(key)
+        return ok
+
+    def _structural_pass(self, blocks: List[Block]) -> List[bytes] | None:
+        ''' Run _structural_check over `blocks` (across worker processes for long
+        chains) and return each block's Merkle root, or None once any block fails. '''
+        check = partial(_structural_check, use_pos=self.use_pos)
+        workers = os.cpu_count() or 1
+        if len(blocks) < PARALLEL_CHECK_MIN or workers < 2:
+            results = map(check, blocks)     # lazy: stops at the first bad block
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            results = pool.map(check, blocks, chunksize=32)
+        roots: List[bytes] = []
+        try:
+            for ok, root in results:
+                if not ok:
+                    return None
+                roots.append(root)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        return roots
+
+    def _prefetch_verify(self, chain: List[Block]) -> bool:
+        ''' Verify every uncached signature in `chain` across worker processes and seed
+        the verify cache, so the per-block replay only hits the cache. Small chains are
+        left to the inline path; returns False as soon as any chunk has a bad signature. '''
+        is_reward = self._is_reward_tx
+        todo = [
+            (self._verify_key(tx), tx)
+            for blk in chain for tx in blk.transactions
+            if not is_reward(tx) and tx.signature is not None
+        ]
+        todo = [(key, tx) for key, tx in todo if key not in self._verify_cache]
+        workers = os.cpu_count() or 1
+        if len(todo) < PARALLEL_VERIFY_MIN or workers < 2:
+            return True
+
+        size = -(-len(todo) // workers)
+        chunks = [todo[i:i + size] for i in range(0, len(todo), size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_verify_chunk, [tx for _, tx in chunk]): chunk for chunk in chunks}
+            for fut in as_completed(futures):
+                results = fut.result()
+                if not all(results):
+                    for other in futures:
+                        other.cancel()
+                    return False
+                for (key, _), ok in zip(futures[fut], results):
+                    self._remember_verify(key, ok)
+        return True
+
+    def _batch_verify(self, user_txs: List[Transaction]) -> bool:
+        ''' Check a block's non-reward signatures in one pass, stopping at the first bad one. '''
+        return all(map(self._verify_cached, user_txs))
+
     def _validate_payload(self, tx: Transaction) -> bool:
         ''' Validate the payload of remittance transactions. '''
         if tx.tx_type == "PAY":
@@ -94,7 +380,7 @@ class Blockchain:
                 isinstance(tx.payload, dict)
                 and "id" in tx.payload
                 and "recipient" in tx.payload
-                and "release_hash" in tx.payload
+                and _is_hex_digest(tx.payload.get("release_hash"))
             )
         elif tx.tx_type == "CLAIM_REMIT":
             return (
@@ -113,33 +399,71 @@ class Blockchain:
     
     def _validate_amount(self, tx: Transaction) -> bool:
         ''' Validate that transaction amounts are sane for each tx type. '''
+        # Every amount and fee must be an int that fits a signed 64-bit field,
+        # and fees can't be negative (a negative fee would credit the sender).
+        if type(tx.amount) is not int or type(tx.fee) is not int:
+            return False
+        if not (0 <= tx.fee <= MAX_AMOUNT and -MAX_AMOUNT <= tx.amount <= MAX_AMOUNT):
+            return False
+        if tx.amount + tx.fee > MAX_AMOUNT:
+            return False
         if tx.tx_type == "PAY":
             return tx.amount >= 0
         if tx.tx_type in {"OPEN_REMIT", "STAKE", "UNSTAKE"}:
             return tx.amount > 0 
         return tx.amount <= 0
     
-    def _select_pos_validator(self, seed_hex: str, accounts: Dict[str, Dict[str, int]] | None = None) -> str:
-        '''   Pick a validator weighted by stake deterministically using a seed, including any pending STAKE txs '''
+    def _pending_frontier(self) -> MerkleFrontier:
+        ''' Copy of the mempool Merkle frontier; it and the running fee and stake
+        totals are rebuilt if `pending` was edited directly. '''
+        if self._frontier.count != len(self.pending):
+            self._reindex_pending()
+        return self._frontier.copy()
+
+    def _reindex_pending(self) -> None:
+        ''' Rebuild the mempool frontier and fee/stake totals from `pending`. '''
+        self._frontier = MerkleFrontier()
+        self._pending_stake = {}
+        for tx in self.pending:
+            self._frontier.append(tx.hash_bytes())
+            self._track_stake(tx)
+        self._pending_fees = self._total_fees(self.pending)
+
+    def _track_stake(self, tx: Transaction) -> None:
+        if tx.tx_type == "STAKE":
+            self._pending_stake[tx.sender] = self._pending_stake.get(tx.sender, 0) + tx.amount
+        elif tx.tx_type == "UNSTAKE":
+            self._pending_stake[tx.sender] = self._pending_stake.get(tx.sender, 0) - tx.amount
+
+    def _select_pos_validator(
+        self,
+        seed_hex: str,
+        accounts: Mapping[str, Account] | None = None,
+        stake_delta: Mapping[str, int] | None = None,
+    ) -> str:
+        '''   Pick a validator weighted by stake deterministically using a seed; `stake_delta`
+        adds not-yet-applied STAKE/UNSTAKE amounts without copying the ledger. '''
         accounts = accounts or self.accounts
-        stake_entries: list[tuple[str, int]] = [(addr, acct["stake"]) for addr, acct in accounts.items() if acct["stake"] > 0]
-        total = sum(s for _, s in stake_entries)
-        if total == 0:
+        delta = stake_delta or {}
+        stakers: list[str] = []
+        stakes: list[int] = []
+        for addr, acct in accounts.items():
+            stake = acct.stake + delta.get(addr, 0)
+            if stake > 0:
+                stakers.append(addr)
+                stakes.append(stake)
+        if not stakers:
             return REWARD_SENDER  # fallback to reward sender if no stake
-        r = int(seed_hex, 16) % total
-        upto = 0
-        for addr, stake in stake_entries:
-            upto += stake
-            if upto >= r:
-                return addr     
-        return stake_entries[-1][0]
+        prefix = list(itertools.accumulate(stakes))          # prefix[i] = stake of stakers[0..i]
+        r = int(seed_hex, 16) % prefix[-1]
+        return stakers[bisect.bisect_left(prefix, r)]         # first cumulative stake >= r
 
     # ---------------------------------------------------------------------#
     #  Genesis
     # ---------------------------------------------------------------------#
 
-    def create_genesis_block(self):
-        genesis = Block(index=0, previous_hash="0")
+    def create_genesis_block(self) -> None:
+        genesis = Block(index=0, previous_hash=GENESIS_PREV)
         genesis.hash = genesis.compute_hash()
         self.chain.append(genesis)
 
@@ -148,17 +472,10 @@ class Blockchain:
     # ---------------------------------------------------------------------#
 
     def add_tx(self, tx: Transaction) -> bool:
-        acct = self._get_acct(tx.sender)
-
+        ''' Admit a tx to the mempool. Cheap ledger checks (type, payload, nonce,
+        funds) run first so stale or unfunded spam is dropped before any ECDSA work. '''
         # tx-type allow-list
-        if tx.tx_type not in {
-            "PAY",
-            "OPEN_REMIT",
-            "CLAIM_REMIT",
-            "STAKE",
-            "UNSTAKE",
-            "SLASH"
-        }:
+        if tx.tx_type not in TX_TYPES:
             print("!  unknown tx type")
             return False
         
@@ -170,92 +487,68 @@ class Blockchain:
             print("! bad amount")
             return False
 
-        # 1) Signature
-        if not tx.verify():
-            print("!  bad signature")
-            return False
+        # Unknown senders are checked against an empty row and only get a
+        # ledger entry once a tx is admitted.
+        acct = self.accounts.get(tx.sender) or Account()
 
-        # 2) Nonce
-        if tx.nonce != acct["nonce"] + 1:
+        # 1) Nonce
+        if tx.nonce != acct.nonce + 1:
             print("!  bad nonce")
             return False
 
-        # 3) Funds
+        # 2) Funds
         needed = tx.amount + tx.fee
         if tx.tx_type in ("PAY", "OPEN_REMIT", "STAKE"):
-            if acct["balance"] < needed:
+            if acct.balance < needed:
                 print("!  insufficient funds")
                 return False
         # Unstake draws from funds
         if tx.tx_type == "UNSTAKE": 
-            if acct["stake"] < tx.amount: 
+            if acct.stake < tx.amount: 
                 print("insufficient stake") 
                 return False
 
+        # 3) Signature
+        if not self._verify_cached(tx):
+            print("!  bad signature")
+            return False
+
         # All good -> enqueue
         self.pending.append(tx)
-        acct["nonce"] += 1
+        self._frontier.append(tx.hash_bytes())
+        self._pending_fees += tx.fee
+        self._track_stake(tx)
+        self._get_acct(tx.sender).nonce += 1
         return True
 
     # ---------------------------------------------------------------------#
     #  Mining / PoW or PoS
     # ---------------------------------------------------------------------#
 
-    def _mine_pow(self, block: Block):
-        target = "0" * DIFFICULTY
-        while True:
-            block.hash = block.compute_hash()
-            if block.hash.startswith(target):
-                break
-            block.nonce += 1
-
-
-    # def _select_pos_validator(self) -> str:
-    #     '''   Pick a validator weighted by stake, including any pending STAKE txs
-    # so that newly‐staked tokens count immediately for this round. '''
-  
-    #     # 1) Build a list of (address, effective_stake)
-    #     stake_entries: list[tuple[str, int]] = []
-    #     for addr, acct in self.accounts.items():
-    #         base_stake = acct["stake"]
-    #         # include any pending STAKE txs for this addr
-    #         pending_stake = sum(
-    #             tx.amount
-    #             for tx in self.pending
-    #             if tx.tx_type == "STAKE" and tx.sender == addr
-    #         )
-    #         effective = base_stake + pending_stake
-    #         if effective > 0:
-    #             stake_entries.append((addr, effective))
-
-    #     # 2) If nobody has any stake, fall back to a random account
-    #     total = sum(s for _, s in stake_entries)
-    #     if total == 0:
-    #         # return random.choice(list(self.accounts) or [""])
-    #         return ""
-
-    #     # 3) Choose a random point in [0, total)
-    #     r = random.uniform(0, total)
-    #     upto = 0
-    #     for addr, stake in stake_entries:
-    #         upto += stake
-    #         if upto >= r:
-    #             return addr
-
-    #     # 4) Fallback (shouldn't really happen)
-    #     return stake_entries[-1][0]
+    def solve_pow(self, block: Block, stop: threading.Event | None = None) -> bool:
+        ''' Set ``block.nonce`` and ``block.hash`` to a header meeting the PoW target.
+        Touches no chain state, so it can run in a worker thread; returns False,
+        leaving ``block`` unsolved, if ``stop`` is set before a nonce is found. '''
+        prefix = block.header_bytes()[:NONCE_OFFSET]
+        if MINING_PROCESSES > 1:
+            hit = _parallel_search(prefix, POW_TARGET, block.nonce, MINING_PROCESSES, stop)
+        elif stop is not None:
+            hit = _serial_search(prefix, POW_TARGET, block.nonce, stop)
+        else:
+            hit = _search_nonce(prefix, POW_TARGET, block.nonce)
+        if hit is None:
+            return False
+        block.nonce, block.hash = hit
+        return True
 
 
     # ---------------------------------------------------------------------#
     #  Mining entry
     # ---------------------------------------------------------------------#
 
-    def mine_block(self, miner_addr: str) -> Block | None:
-        ''' Assemble pending transactions into a new block, optionally include the
-    mining reward, run consensus (PoW or PoS), apply state changes, and
-    append to the chain. '''
-    
-
+    def candidate_block(self, miner_addr: str) -> Block | None:
+        ''' The next block over all pending transactions, plus the mining reward
+    if enabled, with its Merkle root set but no consensus run yet. '''
         if not self.pending:
             print("No tx to mine")
             return None
@@ -263,7 +556,8 @@ class Blockchain:
         # 1) Collect pending transactions
         block_txs = list(self.pending)
 
-        fees = self._total_fees(block_txs)
+        frontier = self._pending_frontier()
+        fees = self._pending_fees
 
         # 2) Optionally include the mining reward
         if self.enable_reward:
@@ -277,6 +571,7 @@ class Blockchain:
                 signature=REWARD_SIGNATURE,
             )
             block_txs.append(reward_tx)
+            frontier.append(reward_tx.hash_bytes())
 
         # 3) Create the new block header
         last = self.chain[-1]
@@ -285,22 +580,23 @@ class Blockchain:
             previous_hash=last.hash,
             transactions=block_txs
         )
-        blk.merkle_root = merkle_root([tx.hash() for tx in block_txs])
-        seed = hashlib.sha256(last.hash.encode()).hexdigest()
+        blk.merkle_root = frontier.root()
+        return blk
+
+    def mine_block(self, miner_addr: str) -> Block | None:
+        ''' Assemble pending transactions into a new block, optionally include the
+    mining reward, run consensus (PoW or PoS), apply state changes, and
+    append to the chain. '''
+        blk = self.candidate_block(miner_addr)
+        if blk is None:
+            return None
+        seed = _fast_hash(blk.previous_hash)
 
 
         # 4) Consensus: PoS or PoW
         if self.use_pos:
             # Include pending stake transitions for validator selection in this round.
-            projected_accounts = {addr: acct.copy() for addr, acct in self.accounts.items()}
-            for tx in block_txs:
-                acct = projected_accounts.setdefault(tx.sender, {"balance": 0, "nonce": 0, "stake": 0})
-                if tx.tx_type == "STAKE":
-                    acct["stake"] += tx.amount
-                elif tx.tx_type == "UNSTAKE":
-                    acct["stake"] -= tx.amount
-
-            validator = self._select_pos_validator(seed, projected_accounts)
+            validator = self._select_pos_validator(seed, self.accounts, self._pending_stake)
             if not validator:
                 print("No eligible PoS validator (no stake)")
                 return None
@@ -311,22 +607,25 @@ class Blockchain:
             last = self._last_signed.get(validator)
             if last == self.chain[-1].index + 1:
                 acct = self._get_acct(validator)
-                slashed = acct["stake"] // 2
-                acct["stake"] -= slashed
+                slashed = acct.stake // 2
+                acct.stake -= slashed
                 print(f"! Slashed {slashed} from {validator} for double-sign")
             self._last_signed[validator] = self.chain[-1].index + 1
             
             # Lightweight “mining” for PoS
             blk.hash = blk.compute_hash()
             # PoS inflation reward
-            self._get_acct(miner_addr)["balance"] += int(BLOCK_REWARD * STAKE_REWARD_PCT)
+            self._get_acct(miner_addr).balance += int(BLOCK_REWARD * STAKE_REWARD_PCT)
         else:
             # Heavy work for PoW
-            self._mine_pow(blk)
+            self.solve_pow(blk)
 
         # 5) Commit state changes and append
         self._apply_block(blk)
         self.pending.clear()
+        self._frontier = MerkleFrontier()
+        self._pending_fees = 0
+        self._pending_stake = {}
         self.chain.append(blk)
         return blk
 
@@ -335,202 +634,194 @@ class Blockchain:
     #  Block-level state transition
     # ---------------------------------------------------------------------#
 
-    def _apply_block(self, blk: Block):
+    def _apply_block(self, blk: Block) -> None:
+        self._replay_block(blk, _Ledger(self._get_acct, self.remits, self.accounts, validate=False))
+
+    def _replay_block(self, blk: Block, ledger: _Ledger) -> bool:
+        ''' Run blk's txs against `ledger`. In validate mode every tx must pass its
+        payload, nonce, funds and evidence checks (False on the first failure, so
+        callers pass scratch state); otherwise trusted txs are applied as-is. '''
+        validate = ledger.validate
+        is_reward = self._is_reward_tx
+        get_acct = ledger.acct
+        handlers = self._TX_HANDLERS
         for tx in blk.transactions:
-            sender = self._get_acct(tx.sender)
-
-            # ------------------ PAY ------------------
-            if tx.tx_type == "PAY":
-                if tx.sender != REWARD_SENDER:
-                    sender["balance"] -= tx.amount + tx.fee
-                recipient = self._get_acct(tx.recipient)
-                recipient["balance"] += tx.amount
-
-            # ------------------ STAKE / UNSTAKE ------------------
-            elif tx.tx_type == "STAKE":
-                sender["balance"] -= tx.amount
-                sender["stake"] += tx.amount
-
-            elif tx.tx_type == "UNSTAKE":
-                sender["stake"] -= tx.amount
-                sender["balance"] += tx.amount
-
-            # ------------------ OPEN_REMIT ------------------
-            elif tx.tx_type == "OPEN_REMIT":
-                rid = tx.payload["id"]
-                r_hash = tx.payload["release_hash"]
-                self.remits[rid] = Remittance(
-                    id=rid,
-                    sender=tx.sender,
-                    recipient=tx.payload["recipient"],
-                    amount=tx.amount,
-                    release_hash=r_hash,
-                )
-                sender["balance"] -= tx.amount + tx.fee
-
-            # ------------------ CLAIM_REMIT ------------------
-            elif tx.tx_type == "CLAIM_REMIT":
-                rid = tx.payload["id"]
-                code = tx.payload["release_code"]
-
-                remit = self.remits.get(rid)
-                if remit and not remit.released:
-                    if (
-                        hashlib.sha256(code.encode()).hexdigest()
-                        == remit.release_hash
-                    ):
-                        recipient = self._get_acct(remit.recipient)
-                        recipient["balance"] += remit.amount
-                        self.remits[rid] = replace(remit, released=True)
-            # ------------------ SLASH ------------------
-            elif tx.tx_type == "SLASH": 
-                offender = tx.payload["offender"]
-                acct = self._get_acct(offender)
-                slashed = acct["stake"] // 2
-                acct["stake"] -= slashed
+            sender = get_acct(tx.sender)
+
+            if validate and not is_reward(tx):
+                if not self._validate_payload(tx) or not self._validate_amount(tx):
+                    return False
+                if tx.nonce != sender.nonce + 1:
+                    return False
+                sender.nonce += 1
+
+            handler = handlers.get(tx.tx_type)
+            if handler is not None and not handler(self, tx, sender, ledger):
+                return False
+        return True
+
+    # ------------------ per-type handlers (return False = invalid) ------------------
+
+    def _replay_pay(self, tx: Transaction, sender: Account, ledger: _Ledger) -> bool:
+        if tx.sender != REWARD_SENDER:
+            if ledger.validate and sender.balance < tx.amount + tx.fee:
+                return False
+            sender.balance -= tx.amount + tx.fee
+        ledger.acct(tx.recipient).balance += tx.amount
+        return True
+
+    def _replay_stake(self, tx: Transaction, sender: Account, ledger: _Ledger) -> bool:
+        if ledger.validate and sender.balance < tx.amount:
+            return False
+        sender.balance -= tx.amount
+        sender.stake += tx.amount
+        return True
+
+    def _replay_unstake(self, tx: Transaction, sender: Account, ledger: _Ledger) -> bool:
+        if ledger.validate and sender.stake < tx.amount:
+            return False
+        sender.stake -= tx.amount
+        sender.balance += tx.amount
+        return True
+
+    def _replay_open_remit(self, tx: Transaction, sender: Account, ledger: _Ledger) -> bool:
+        rid = tx.payload["id"]
+        if ledger.validate and (rid in ledger.remits or sender.balance < tx.amount + tx.fee):
+            return False
+        ledger.remits[rid] = Remittance(
+            id=rid,
+            sender=tx.sender,
+            recipient=tx.payload["recipient"],
+            amount=tx.amount,
+            release_hash=bytes.fromhex(tx.payload["release_hash"]),
+        )
+        sender.balance -= tx.amount + tx.fee
+        return True
+
+    def _replay_claim_remit(self, tx: Transaction, sender: Account, ledger: _Ledger) -> bool:
+        rid = tx.payload["id"]
+        code = tx.payload["release_code"]
+        remit = ledger.remits.get(rid)
+        # A wrong code or an already-released remit is a no-op, not an invalid block
+        if remit and not remit.released:
+            if hmac.compare_digest(hashlib.sha256(code.encode()).digest(), remit.release_hash):
+                ledger.acct(remit.recipient).balance += remit.amount
+                if ledger.validate:     # scratch replay: don't flip the live record
+                    remit = ledger.remits[rid] = replace(remit)
+                remit.released = True
+        return True
+
+    def _replay_slash(self, tx: Transaction, sender: Account, ledger: _Ledger) -> bool:
+        acct = ledger.acct(tx.payload["offender"])
+        if ledger.validate:
+            if not self._valid_slash_evidence(tx.payload, ledger.accounts):
+                return False
+            if acct.stake <= 0:
+                return False
+        acct.stake -= acct.stake // 2
+        return True
+
+    _TX_HANDLERS: Dict[str, Callable[[Blockchain, Transaction, Account, _Ledger], bool]] = {
+        "PAY": _replay_pay,
+        "STAKE": _replay_stake,
+        "UNSTAKE": _replay_unstake,
+        "OPEN_REMIT": _replay_open_remit,
+        "CLAIM_REMIT": _replay_claim_remit,
+        "SLASH": _replay_slash,
+    }
 
 
     # ---------------------------------------------------------------------#
     #  Block validation for incoming blocks
     # ---------------------------------------------------------------------#
 
-    def validate_block(self, blk: Block, prev_blk: Block) -> bool:
+    def validate_block(self, blk: Block, prev_blk: Block, unconfirmed: Mapping[str, int] | None = None) -> bool:
+        ''' ``unconfirmed`` counts, per sender, the pending txs whose nonces the
+        live ledger already includes; they are wound back before the nonce check
+        so a block carrying txs we also hold in the mempool still validates. '''
         if blk.previous_hash != prev_blk.hash:
             return False
         if blk.index != prev_blk.index + 1:
             return False
-        if not self.use_pos and not blk.hash.startswith("0" * DIFFICULTY):
+        if not self.use_pos and not _meets_target(blk.hash):
             return False
         
-        computed_merkle = merkle_root([tx.hash() for tx in blk.transactions])
+        computed_merkle = merkle_root([tx.hash_bytes() for tx in blk.transactions])
         if blk.merkle_root and blk.merkle_root != computed_merkle: 
             return False
-        if blk.hash != blk.compute_hash(): 
+        if blk.hash != blk.compute_hash(computed_merkle): 
             return False
         
-        reward_txs = [tx for tx in blk.transactions if self._is_reward_tx(tx)]
+        reward_txs, user_txs = self._split_rewards(blk.transactions)
         if len(reward_txs) > 1: 
             return False
-        fees = self._total_fees(blk.transactions)
+        fees = sum(map(_fee, user_txs))
         if self.enable_reward and reward_txs:
             expected_amount = BLOCK_REWARD + fees
             if reward_txs[0].amount != expected_amount:
                 return False
         
         if self.use_pos and reward_txs: 
-            seed = hashlib.sha256(f"{prev_blk.hash}{computed_merkle}".encode()).hexdigest()
+            seed = _fast_hash(prev_blk.hash + computed_merkle)
             validator = self._select_pos_validator(seed, self.accounts)
             if reward_txs[0].recipient != validator:
                 return False
             
-        temp_accounts = {addr: acct.copy() for addr, acct in self.accounts.items()}
-        temp_remits = {rid: remit for rid, remit in self.remits.items()}
-        
-        def get_temp_acct(addr: str) -> Dict[str, int]:
-            return temp_accounts.setdefault(addr, {"balance": 0, "nonce": 0, "stake": 0})
-        
-        for tx in blk.transactions:
-            if not self._is_reward_tx(tx): 
-                if not self._validate_payload(tx):
-                    return False
-                if not self._validate_amount(tx):
-                    return False    
-                if not tx.verify():
-                    return False
-                
-            sender = get_temp_acct(tx.sender)
+        if not self._batch_verify(user_txs):
+            return False
 
-            if not self._is_reward_tx(tx):
-                if tx.nonce != sender["nonce"] + 1:
-                    return False
-                sender["nonce"] += 1    
-
-            if tx.tx_type == "PAY":
-                if tx.sender != REWARD_SENDER:
-                    if sender["balance"] < tx.amount + tx.fee:
-                        return False
-                    sender["balance"] -= tx.amount + tx.fee
-                recipient = get_temp_acct(tx.recipient)
-                recipient["balance"] += tx.amount
-            
-            elif tx.tx_type == "STAKE":
-                if sender["balance"] < tx.amount:
-                    return False
-                sender["balance"] -= tx.amount
-                sender["stake"] += tx.amount
-            
-            elif tx.tx_type == "UNSTAKE":
-                if sender["stake"] < tx.amount:
-                    return False
-                sender["stake"] -= tx.amount
-                sender["balance"] += tx.amount  
+        # Copy-on-write overlays: only rows this block touches are copied, and
+        # remit writes land in the front map while reads fall through to self.remits.
+        temp_accounts: Dict[str, Account] = {}
+        
+        def get_temp_acct(addr: str) -> Account:
+            acct = temp_accounts.get(addr)
+            if acct is None:
+                base = self.accounts.get(addr)
+                acct = temp_accounts[addr] = base.copy() if base is not None else Account()
+                if unconfirmed:
+                    acct.nonce -= unconfirmed.get(addr, 0)
+            return acct
+
+        ledger = _Ledger(get_temp_acct, ChainMap({}, self.remits), self.accounts, validate=True)
+        return self._replay_block(blk, ledger)
 
-            elif tx.tx_type == "OPEN_REMIT":
-                rid = tx.payload["id"]
-                if rid in temp_remits:
-                    return False
-                temp_remits[rid] = Remittance(
-                    id=rid,
-                    sender=tx.sender,
-                    recipient=tx.payload["recipient"], 
-                    amount=tx.amount,
-                    release_hash=tx.payload["release_hash"],
-                )
-                if sender["balance"] < tx.amount + tx.fee: 
-                    return False
-                sender["balance"] -= tx.amount + tx.fee
-
-
-            elif tx.tx_type == "CLAIM_REMIT":
-                rid = tx.payload["id"]
-                code = tx.payload["release_code"]
-                remit = temp_remits.get(rid)
-                if remit and not remit.released:
-                    if (
-                        hashlib.sha256(code.encode()).hexdigest()
-                        == remit.release_hash
-                    ):
-                        return False
-                    recipient = get_temp_acct(remit.recipient)
-                    recipient["balance"] += remit.amount
-                    temp_remits[rid] = replace(remit, released=True)
-    
-        return True
     # ---------------------------------------------------------------------#
     #  Chain validation for new nodes
     # ---------------------------------------------------------------------#
 
     def _validate_chain(self, chain: List[Block]) -> bool:
-        temp_accounts: Dict[str, Dict[str, int]] = {}
+        temp_accounts: Dict[str, Account] = {}
         temp_remits: Dict[str, Remittance] = {}
 
-        def get_temp_acct(addr: str) -> Dict[str, int]:
-            return temp_accounts.setdefault(addr, {"balance": 0, "nonce": 0, "stake": 0})
+        def get_temp_acct(addr: str) -> Account:
+            return temp_accounts.setdefault(addr, Account())
+
+        ledger = _Ledger(get_temp_acct, temp_remits, temp_accounts, validate=True)
         
         if not chain:
             return False
         genesis = chain[0]
-        if genesis.index != 0 or genesis.previous_hash != "0":
+        if genesis.index != 0 or genesis.previous_hash != GENESIS_PREV:
             return False
         if genesis.hash != genesis.compute_hash():
             return False
+        # Phase 1: stateless per-block checks, then signatures; Phase 2 replays in order
+        roots = self._structural_pass(chain[1:])
+        if roots is None:
+            return False
+        if not self._prefetch_verify(chain):
+            return False
         
         for i, blk in enumerate(chain[1:], 1): 
             prev = chain[i - 1]
             if blk.previous_hash != prev.hash:
                 return False
-            if not self.use_pos and not blk.hash.startswith("0" * DIFFICULTY):
-                return False
-            computed_merkle = merkle_root([tx.hash() for tx in blk.transactions])
-            if blk.merkle_root and blk.merkle_root != computed_merkle: 
-                return False
-            if blk.hash != blk.compute_hash():
-                return False
             
-            reward_txs = [tx for tx in blk.transactions if self._is_reward_tx(tx)]
+            reward_txs, user_txs = self._split_rewards(blk.transactions)
             if len(reward_txs) > 1:
                 return False
-            fees = self._total_fees(blk.transactions)
+            fees = sum(map(_fee, user_txs))
             if self.enable_reward: 
                 if not reward_txs:
                     return False
@@ -538,90 +829,60 @@ class Blockchain:
                     return False
             
             if self.use_pos and reward_txs:
-                # merkle_root = blk.merkle_root or merkle_root([tx.hash() for tx in blk.transactions])
-                seed = hashlib.sha256(prev.hash.encode()).hexdigest()
+                seed = _fast_hash(prev.hash)
                 validator = self._select_pos_validator(seed, temp_accounts)
                 if reward_txs[0].recipient != validator:
                     return False
 
-            for tx in blk.transactions: 
-                if not self._is_reward_tx(tx):
-                    if not self._validate_payload(tx):
-                        return False
-                    if not self._validate_amount(tx):
-                        return False
-                    if not tx.verify():
-                        return False
-
-                sender = get_temp_acct(tx.sender)
-
-                if not self._is_reward_tx(tx):
-                    if tx.nonce != sender["nonce"] + 1:
-                        return False
-                    sender["nonce"] += 1
-
-                if tx.tx_type == "PAY":
-                    if tx.sender != REWARD_SENDER:
-                        if sender["balance"] < tx.amount + tx.fee:
-                            return False
-                        sender["balance"] -= tx.amount + tx.fee
-                    recipient = get_temp_acct(tx.recipient)
-                    recipient["balance"] += tx.amount
-
-                elif tx.tx_type == "STAKE":
-                    if sender["balance"] < tx.amount:
-                        return False
-                    sender["balance"] -= tx.amount
-                    sender["stake"] += tx.amount
-
-                elif tx.tx_type == "UNSTAKE":
-                    if sender["stake"] < tx.amount:
-                        return False
-                    sender["stake"] -= tx.amount
-                    sender["balance"] += tx.amount
-
-                elif tx.tx_type == "OPEN_REMIT":
-                    rid = tx.payload["id"]
-                    if rid in temp_remits:
-                        return False
-                    temp_remits[rid] = Remittance(
-                        id=rid,
-                        sender=tx.sender,
-                        recipient=tx.payload["recipient"],
-                        amount=tx.amount,
-                        release_hash=tx.payload["release_hash"],
-                    )
-                    if sender["balance"] < tx.amount + tx.fee:
-                        return False
-                    sender["balance"] -= tx.amount + tx.fee
-
-                elif tx.tx_type == "CLAIM_REMIT":
-                    rid = tx.payload["id"]
-                    code = tx.payload["release_code"]
-                    remit = temp_remits.get(rid)
-                    if remit and not remit.released:
-                        if (
-                            hashlib.sha256(code.encode()).hexdigest()
-                            == remit.release_hash
-                        ):
-                            recipient = get_temp_acct(remit.recipient)
-                            recipient["balance"] += remit.amount
-                            temp_remits[rid] = replace(remit, released=True)   
-                elif tx.tx_type == "SLASH": 
-                    if not self._valid_slash_evidence(tx.payload, temp_accounts):
-                        return False
-                    offender = tx.payload["offender"]
-                    acct = get_temp_acct(offender)
-                    if acct["stake"] <= 0:
-                        return False
-                    slashed = acct["stake"] // 2
-                    acct["stake"] -= slashed
+            if not self._batch_verify(user_txs):
+                return False
+
+            if not self._replay_block(blk, ledger):
+                return False
 
         return True
 
 
     def is_valid_chain(self) -> bool:
         return self._validate_chain(self.chain)
+
+    def add_block(self, blk: Block) -> bool:
+        ''' Append a peer's block if it extends our tip. Blocks already on the chain
+        are trusted, so only the new block is checked; the parent-link compare
+        runs first and drops stale or forked blocks before any hashing. '''
+        tip = self.chain[-1]
+        if blk.previous_hash != tip.hash:
+            return False
+        unconfirmed = Counter(tx.sender for tx in self.pending)
+        if not self.validate_block(blk, tip, unconfirmed):
+            return False
+        self._apply_block(blk)
+        self.chain.append(blk)
+        self._settle_pending(blk)
+        return True
+
+    def _settle_pending(self, blk: Block) -> None:
+        ''' After a peer's block lands: drop the pending txs it included or made
+        stale, and move each of its senders' nonces past both the block and
+        whatever of theirs is still pending (_apply_block leaves nonces alone). '''
+        last: Dict[str, int] = {}
+        for tx in self._split_rewards(blk.transactions)[1]:
+            last[tx.sender] = tx.nonce
+        if not last:
+            return
+        included = {tx.hash_bytes() for tx in blk.transactions}
+        kept = [
+            tx for tx in self.pending
+            if tx.hash_bytes() not in included and tx.nonce > last.get(tx.sender, 0)
+        ]
+        if len(kept) != len(self.pending):
+            self.pending = kept
+            self._reindex_pending()
+        for tx in self.pending:
+            if tx.sender in last:
+                last[tx.sender] = max(last[tx.sender], tx.nonce)
+        for sender, nonce in last.items():
+            self._get_acct(sender).nonce = nonce
     
     def replace_chain(self, new_chain: List[Block]) -> bool:
         if len(new_chain) <= len(self.chain):
@@ -629,35 +890,44 @@ class Blockchain:
         if not self._validate_chain(new_chain): 
             return False
         self.chain = new_chain
-        self.accounts = {}
+        self.accounts = AccountTable()
         self.remits = {}
         self.pending = []
+        self._frontier = MerkleFrontier()
+        self._pending_fees = 0
+        self._pending_stake = {}
         self._last_signed = {}
+        self._verify_cache.clear()
         for blk in self.chain[1:]: 
             self._apply_block(blk)
+            self._settle_pending(blk)
         return True
     
-    def _valid_slash_evidence(self, payload: dict, accounts: Dict[str, Dict[str, int]]) -> bool:
+    def _valid_slash_evidence(self, payload: dict, accounts: Dict[str, Account]) -> bool:
         offender = payload.get("offender")
         block_a = payload.get("block_a")
         block_b = payload.get("block_b")
         if not offender or not isinstance(block_a, dict) or not isinstance(block_b, dict):
             return False
-        blk_a = Block.from_dict(block_a)
-        blk_b = Block.from_dict(block_b)
-        if blk_a.index != blk_b.previous_hash: 
+        try:
+            blk_a = Block.from_dict(block_a)
+            blk_b = Block.from_dict(block_b)
+        except ValueError:
+            return False
+        # Double-signing means two different blocks at the same height on the same parent
+        if blk_a.index != blk_b.index or blk_a.previous_hash != blk_b.previous_hash:
             return False
         if blk_a.hash == blk_b.hash:
             return False
         
-        computed_a = merkle_root([tx.hash() for tx in blk_a.transactions])
-        computed_b = merkle_root([tx.hash() for tx in blk_b.transactions])
+        computed_a = merkle_root([tx.hash_bytes() for tx in blk_a.transactions])
+        computed_b = merkle_root([tx.hash_bytes() for tx in blk_b.transactions])
         if blk_a.merkle_root and blk_a.merkle_root != computed_a: 
             return False
         if blk_b.merkle_root and blk_b.merkle_root != computed_b:
             return False
         
-        seed = hashlib.sha256(blk_a.previous_hash.encode()).hexdigest()
+        seed = _fast_hash(blk_a.previous_hash)
         validator = self._select_pos_validator(seed, accounts)
         if offender != validator: 
             return False
@@ -687,5 +957,5 @@ if __name__ == "__main__":
     # mine empty (just reward) block
     blk = bc.mine_block(miner_addr=pub)
     if blk:
-        print("Mined", blk.hash[:16], "height", blk.index)
-        print("Balance: ", bc.accounts[pub]["balance"])
+        print("Mined", blk.hash.hex()[:16], "height", blk.index)
+        print("Balance: ", bc.accounts[pub].balance)
@@ -1,6 +1,35 @@
 DIFFICULTY       = 4          # number of leading zeros for PoW
 BLOCK_REWARD     = 50_000_000 # satoshis (or smallest unit)
 STAKE_REWARD_PCT = 0.02       # 2 % staking inflation
+MAX_AMOUNT       = 2**63 - 1  # amounts/fees must fit a signed 64-bit integer
+
+# PoW nonce search: worker processes (1 = search inline) and nonces per work unit.
+# At DIFFICULTY 4 a block takes ~65k tries, less than pool start-up costs, so
+# raise this only for higher difficulties.
+MINING_PROCESSES = 1
+POW_SPAN         = 1 << 16
+
+# Max signature-check results remembered per node (LRU)
+VERIFY_CACHE_SIZE = 65_536
+# Parsed public keys kept per process for verify() (LRU), keyed by sender hex.
+# Private keys are re-parsed on every sign() and never cached.
+KEY_CACHE_SIZE    = 4_096
+
+# Uncached signatures in a replayed chain before verification fans out to
+# worker processes; below this, pool start-up costs more than it saves
+PARALLEL_VERIFY_MIN = 2_000
+# Same idea for the per-block structural checks (Merkle root, header hash)
+PARALLEL_CHECK_MIN  = 256
+
+# Websocket limits for p2p links. A full chain_response soon outgrows the library's
+# 1 MiB default frame cap (the link is then closed with 1009), and a larger write
+# buffer keeps a burst of gossip from waiting on drain after every frame.
+WS_MAX_SIZE    = 1 << 24
+WS_WRITE_LIMIT = 1 << 20
+
+# Hash for internal Merkle nodes: any hashlib constructor with a 32-byte digest
+# ("sha256" for compatibility, "blake2s" is faster for 64-byte pairs)
+MERKLE_HASH      = "sha256"
 
 # Deterministic JSON separators: no spaces so hashes are stable
 JSON_SEP = (",", ":")
@@ -1,11 +1,17 @@
 # p2p.py
 
 import asyncio
-import json
+import hashlib
 import argparse
+import json
+import re
+import threading
+from collections import OrderedDict
+import orjson
 import websockets
 
-from src.pychain.blockchain import Blockchain
+from src.pychain.blockchain import Account, Blockchain
+from src.pychain.config import JSON_SEP, WS_MAX_SIZE, WS_WRITE_LIMIT
 from src.pychain.block import Block
 from src.pychain.transaction import Transaction, gen_keypair
 
@@ -14,96 +20,254 @@ from src.pychain.transaction import Transaction, gen_keypair
     This is a minimal P2P implementation for demo purposes only.
 """
 
+# Recently seen tx/block messages remembered per node, so gossip echoes are dropped
+SEEN_CACHE_SIZE = 10_000
+
+# Relayed txs are coalesced into one "tx_batch" frame per peer: flushed when
+# TX_BATCH_SIZE txs are waiting or TX_BATCH_DELAY seconds after the first one
+TX_BATCH_SIZE  = 64
+TX_BATCH_DELAY = 0.005
+
+_GOSSIP = ("tx", "tx_batch", "block")
+
+# Same limits on both ends of a link (see config)
+_WS_OPTIONS = {"max_size": WS_MAX_SIZE, "write_limit": WS_WRITE_LIMIT}
+
+
+# orjson only handles integers in [-2**63, 2**64): it decodes larger ones as floats and
+# refuses to encode them. Either would change a signed tx body or a block header, so any
+# message with a number of 19+ digits goes through json, which keeps ints exact.
+_LONG_NUMBER = re.compile(rb"\d{19}")
+
+
+def _msg_key(msg: bytes) -> bytes:
+    return hashlib.blake2b(msg, digest_size=16).digest()
+
+
+def _loads(msg: bytes):
+    if _LONG_NUMBER.search(msg) is None:
+        try:
+            return orjson.loads(msg)
+        except orjson.JSONDecodeError:
+            pass                # json may still read it (NaN, 1e400, ...)
+    return json.loads(msg)
+
+
+def _dumps(obj) -> bytes:
+    try:
+        return orjson.dumps(obj)
+    except orjson.JSONEncodeError:
+        return json.dumps(obj, separators=JSON_SEP).encode()
+
+
 class P2PNode:
     def __init__(self, port: int, peers: list[str]):
         self.port = port
         self.peers = peers
         self.blockchain = Blockchain(use_pos=False, enable_reward=True)
+        # Long-lived outbound connection per peer, opened on first send
+        self._peer_ws: dict = {}
+        self._peer_locks: dict[str, asyncio.Lock] = {}   # one connect at a time per peer
+        self._seen: OrderedDict[bytes, None] = OrderedDict()  # digests of gossiped tx/block messages
+        self._tx_outbox: list[dict] = []        # accepted txs waiting to be relayed
+        self._tx_flush: asyncio.TimerHandle | None = None
+        self._mining_stop: threading.Event | None = None   # set to abandon the running nonce search
 
         # Generate and fund this node’s own wallet
         self.priv_key, self.miner_addr = gen_keypair()
-        self.blockchain.accounts[self.miner_addr] = {
-            "balance": 100_000_000,
-            "nonce": 0,
-            "stake": 0,
-        }
+        self.blockchain.accounts[self.miner_addr] = Account(balance=100_000_000)
 
     async def handler(self, ws, path=None):
         """ Handle incoming messages from peers (listens on self.port for messages) """
         async for msg in ws:
-            data = json.loads(msg)
-            kind = data.get("type")
-
-            if kind == "faucet":
-                # Faucet: credit an address directly
-                addr = data["payload"]["address"]
-                amt  = data["payload"].get("amount", 50_000_000)
-                self.blockchain.accounts[addr] = {"balance": amt, "nonce": 0, "stake": 0}
-                print(f"[Node {self.port}] Faucet funded {addr} with {amt}")
-
-
-            elif kind == "tx":
-                # Recieves a transaction, validates it and adds to mempool
-                tx = Transaction.from_dict(data["payload"])
-                added = self.blockchain.add_tx(tx)
-                print(f"[Node {self.port}] Received TX: added={added}")
-                if added:
-                    asyncio.create_task(self.broadcast("tx", tx.to_dict()))
-
-            elif kind == "block":
-                # Recieves a new block(mined by a peer), validates and appends to local chain
+            # One malformed message must not end the read loop for the whole link
+            try:
+                await self._on_message(ws, msg)
+            except websockets.ConnectionClosed:
+                raise
+            except Exception as e:
+                print(f"[Node {self.port}] Dropped message: {e!r}")
+
+    async def _on_message(self, ws, msg: str | bytes):
+        # Gossip comes back from every peer we relayed to; drop repeats before decoding
+        if isinstance(msg, str):
+            msg = msg.encode()
+        key = _msg_key(msg)
+        if key in self._seen:
+            self._seen.move_to_end(key)
+            return
+        data = _loads(msg)
+        kind = data.get("type")
+        if kind in _GOSSIP:              # requests/responses may legitimately repeat
+            self._mark_seen(key)
+
+        if kind == "faucet":
+            # Faucet: credit an address directly
+            addr = data["payload"]["address"]
+            amt  = data["payload"].get("amount", 50_000_000)
+            self.blockchain.accounts[addr] = Account(balance=amt)
+            print(f"[Node {self.port}] Faucet funded {addr} with {amt}")
+
+
+        elif kind == "tx":
+            # Recieves a transaction, validates it and adds to mempool
+            tx = Transaction.from_dict(data["payload"])
+            added = self.blockchain.add_tx(tx)
+            print(f"[Node {self.port}] Received TX: added={added}")
+            if added:
+                self._queue_tx(tx.to_dict())
+
+        elif kind == "tx_batch":
+            # Many txs in one frame (send_tx.py, or a peer's relay); same checks per tx
+            added = 0
+            for tx_data in data["payload"]:
+                tx = Transaction.from_dict(tx_data)
+                if self.blockchain.add_tx(tx):
+                    self._queue_tx(tx.to_dict())
+                    added += 1
+            print(f"[Node {self.port}] Received TX batch: added={added}/{len(data['payload'])}")
+
+        elif kind == "block":
+            # Recieves a new block(mined by a peer), validates and appends to local chain
+            try:
                 blk = Block.from_dict(data["payload"])
-                prev = self.blockchain[-1]
-                if blk.index == prev.index + 1 and self.blockchain.validate_block(blk, prev):
-                    self.blockchain._apply_block(blk)
-                    self.blockchain.chain.append(blk)
-                    print(f"[Node {self.port}] Appended block {blk.index}")
-                else:
-                    if blk.index > prev.index +1:
-                        await ws.send(json.dumps({"type": "chain_request"}))
-                    print(f"[Node {self.port}] Rejected block {blk.index}")
-            
-            elif kind == "chain_request": 
-                payload = [blk.to_dict() for blk in self.blockchain.chain]
-                await ws.send(json.dumps({"type": "chain_response", "payload": payload}))
-
-            elif kind == "chain_response":
-                chain_data = data.get("payload", [])
+            except ValueError as e:
+                print(f"[Node {self.port}] Rejected malformed block: {e}")
+                return
+            prev = self.blockchain.chain[-1]
+            if self.blockchain.add_block(blk):
+                self._stop_mining()
+                print(f"[Node {self.port}] Appended block {blk.index}")
+            else:
+                if blk.index > prev.index +1:
+                    await ws.send(orjson.dumps({"type": "chain_request"}))
+                print(f"[Node {self.port}] Rejected block {blk.index}")
+        
+        elif kind == "chain_request": 
+            payload = [blk.to_dict() for blk in self.blockchain.chain]
+            await ws.send(_dumps({"type": "chain_response", "payload": payload}))
+
+        elif kind == "chain_response":
+            chain_data = data.get("payload", [])
+            try:
                 new_chain = [Block.from_dict(blk) for blk in chain_data]
-                if self.blockchain.replace_chain(new_chain):
-                    print(f"[Node {self.port}] Replaced chain at height {len(new_chain) -1}")
-                else: 
-                    print(f"[Node self.port] Rejected chain response")
+            except ValueError as e:
+                print(f"[Node {self.port}] Rejected malformed chain response: {e}")
+                return
+            if self.blockchain.replace_chain(new_chain):
+                self._stop_mining()
+                print(f"[Node {self.port}] Replaced chain at height {len(new_chain) -1}")
+            else: 
+                print(f"[Node self.port] Rejected chain response")
 
 
-    async def broadcast(self, kind: str, obj: dict):
+    def _mark_seen(self, key: bytes):
+        self._seen[key] = None
+        if len(self._seen) > SEEN_CACHE_SIZE:
+            self._seen.popitem(last=False)
+
+    def _queue_tx(self, tx_data: dict):
+        ''' Relay an accepted tx with the next batch instead of a frame of its own. '''
+        self._tx_outbox.append(tx_data)
+        if len(self._tx_outbox) >= TX_BATCH_SIZE:
+            self._flush_txs()
+        elif self._tx_flush is None:
+            self._tx_flush = asyncio.get_running_loop().call_later(TX_BATCH_DELAY, self._flush_txs)
+
+    def _flush_txs(self):
+        if self._tx_flush is not None:
+            self._tx_flush.cancel()
+            self._tx_flush = None
+        batch, self._tx_outbox = self._tx_outbox, []
+        if len(batch) == 1:
+            asyncio.create_task(self.broadcast("tx", batch[0]))
+        elif batch:
+            asyncio.create_task(self.broadcast("tx_batch", batch))
+
+    async def broadcast(self, kind: str, obj: dict | list):
         """ Broadcast a message to all peers
             When this node mines a block or receives a valid tx, it broadcasts to peers
         
-            kind: 'tx', 'block', 'faucet'
-            obj: dict payload
+            kind: 'tx', 'tx_batch', 'block', 'faucet'
+            obj: dict payload (a list of tx dicts for 'tx_batch')
          """
-        msg = json.dumps({"type": kind, "payload": obj})
-        for peer in self.peers:
+        # Encode once, then send to every peer concurrently instead of one after another
+        msg = _dumps({"type": kind, "payload": obj})
+        if kind in _GOSSIP:                  # don't re-process our own message when peers echo it
+            self._mark_seen(_msg_key(msg))
+        await asyncio.gather(*(self._send(peer, msg) for peer in self.peers))
+
+    async def _get_ws(self, peer: str):
+        """ Cached connection to `peer`, (re)connecting if there is none.
+            Replies the peer sends back on it (e.g. chain_request) go through handler. """
+        async with self._peer_locks.setdefault(peer, asyncio.Lock()):
+            ws = self._peer_ws.get(peer)
+            if ws is None:
+                ws = self._peer_ws[peer] = await websockets.connect(peer, **_WS_OPTIONS)
+                asyncio.create_task(self._read_peer(peer, ws))
+        return ws
+
+    async def _read_peer(self, peer: str, ws):
+        try:
+            await self.handler(ws)
+        except websockets.ConnectionClosed:
+            pass
+        except Exception as e:
+            print(f"[Node {self.port}] Reader for {peer} failed: {e!r}")
+        finally:
+            # Whatever ended the loop, never leave an unread socket cached for sends
+            if self._peer_ws.get(peer) is ws:
+                del self._peer_ws[peer]
+            await ws.close()
+
+    async def _send(self, peer: str, msg: bytes):
+        # One retry: a cached connection may have been closed by the peer since last use
+        for attempt in range(2):
             try:
-                async with websockets.connect(peer) as ws:
-                    await ws.send(msg)
+                ws = await self._get_ws(peer)
+                await ws.send(msg)
+                return
+            except websockets.ConnectionClosed:
+                self._peer_ws.pop(peer, None)
             except Exception as e:
                 print(f"[Node {self.port}] Failed to send to {peer}: {e}")
+                return
+        print(f"[Node {self.port}] Failed to send to {peer}: connection closed")
 
 
     async def periodic_mine(self):
         """ Periodically attempt to mine a block every 5 seconds """
         while True:
             await asyncio.sleep(5)
-            blk = self.blockchain.mine_block(miner_addr=self.miner_addr)
-            if blk:
-                print(f"[Node {self.port}] Mined block {blk.index}")
-                await self.broadcast("block", blk.to_dict())
+            await self._mine_once()
+
+    async def _mine_once(self):
+        """ Mine the mempool into one block without stalling the loop: the candidate is
+            built here, the nonce search runs in a worker thread, and the solved block
+            goes through add_block, which re-checks the tip and settles the mempool
+            against whatever arrived meanwhile. A peer block landing first stops the search. """
+        bc = self.blockchain
+        blk = bc.candidate_block(miner_addr=self.miner_addr)
+        if blk is None:
+            return
+        self._mining_stop = stop = threading.Event()
+        try:
+            solved = await asyncio.get_running_loop().run_in_executor(None, bc.solve_pow, blk, stop)
+        finally:
+            self._mining_stop = None
+        if solved and bc.add_block(blk):
+            print(f"[Node {self.port}] Mined block {blk.index}")
+            await self.broadcast("block", blk.to_dict())
+        else:
+            print(f"[Node {self.port}] Dropped mined block {blk.index}: tip moved")
+
+    def _stop_mining(self):
+        if self._mining_stop is not None:
+            self._mining_stop.set()
 
 
     async def run(self):
-        server = await websockets.serve(self.handler, "localhost", self.port)
+        server = await websockets.serve(self.handler, "localhost", self.port, **_WS_OPTIONS)
         print(f"[Node {self.port}] Listening on ws://localhost:{self.port}")
         asyncio.create_task(self.sync_with_peers())
         asyncio.create_task(self.periodic_mine())
@@ -112,8 +276,8 @@ class P2PNode:
     async def sync_with_peers(self): 
         for peer in self.peers: 
             try: 
-                async with websockets.connect(peer) as ws: 
-                    await ws.send(json.dumps({"type": "chain_request"}))
+                async with websockets.connect(peer, **_WS_OPTIONS) as ws: 
+                    await ws.send(orjson.dumps({"type": "chain_request"}))
             except Exception as e: 
                 print(f"[Node {self.port}] Failed to synce with {peer}: {e}")
     
@@ -1,12 +1,59 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
 import json, hashlib, secrets
-from src.pychain.config import JSON_SEP
+import orjson
+from src.pychain.config import JSON_SEP, KEY_CACHE_SIZE
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric import ec, utils
 from cryptography.exceptions import InvalidSignature
 
 
+_ECDSA_PREHASHED = ec.ECDSA(utils.Prehashed(hashes.SHA256()))
+
+
+# Decoding an encoded point costs more than the verify it feeds, and the same few
+# senders show up over and over. Bad input raises, and lru_cache does not remember
+# exceptions, so only parsed keys are cached. Private keys are never cached: /tx
+# receives client PEMs, and those must not outlive the request.
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _load_pub(sender_hex: str) -> ec.EllipticCurvePublicKey:
+    return ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256K1(), bytes.fromhex(sender_hex))
+
+
+# orjson emits compact separators only, so it can stand in for json.dumps
+# only while the canonical form is compact too
+_ORJSON_BODY = JSON_SEP == (",", ":")
+
+
+def _canonical(body: dict) -> bytes:
+    ''' json.dumps(body, sort_keys=True, separators=JSON_SEP).encode(), taking the
+    much faster orjson route when that provably gives the same bytes: every field
+    is an exact int/str/None (floats print differently and orjson turns NaN into
+    null), the payload is absent or flat str -> str, and the output is ASCII
+    without DEL, which json escapes and orjson writes raw. orjson raises on ints
+    past 64 bits. These bytes are hashed and signed, so any doubt takes json. '''
+    payload = body["payload"]
+    recipient = body["recipient"]
+    if (
+        _ORJSON_BODY
+        and type(body["tx_type"]) is str and type(body["sender"]) is str
+        and (recipient is None or type(recipient) is str)
+        and type(body["amount"]) is int and type(body["fee"]) is int and type(body["nonce"]) is int
+        and (payload is None or (
+            type(payload) is dict and all(type(k) is str and type(v) is str for k, v in payload.items())
+        ))
+    ):
+        try:
+            out = orjson.dumps(body, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass
+        else:
+            if out.isascii() and b"\x7f" not in out:
+                return out
+    return json.dumps(body, sort_keys=True, separators=JSON_SEP).encode()
+
+
 def gen_keypair() -> tuple[str, str]:
     """
     Returns (private_pem, public_hex)
@@ -24,7 +71,7 @@ def gen_keypair() -> tuple[str, str]:
     return priv_pem, pub_hex
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Transaction:
     """
     Three kinds:
@@ -40,30 +87,53 @@ class Transaction:
     nonce: int
     payload: Optional[dict] = None  # e.g. {"release_hash": "..."}
     signature: Optional[str] = None
+    # Memoized encodings (see _body/hash_bytes); slots instead of a per-tx __dict__
+    _body_cache: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _hash_cache: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
 
     # ---------- helpers ----------
+    # Fields are frozen and the signature is left out of the body, so the
+    # canonical body and its digest are built once and memoized on the instance.
     def _body(self) -> bytes:
-        d = asdict(self)
-        d.pop("signature")
-        return json.dumps(d, sort_keys=True, separators=JSON_SEP).encode()
+        body = self._body_cache
+        if body is None:
+            # Built directly instead of asdict(), which deep-copies payload and
+            # then has the signature popped again.
+            body = _canonical({
+                "amount": self.amount,
+                "fee": self.fee,
+                "nonce": self.nonce,
+                "payload": self.payload,
+                "recipient": self.recipient,
+                "sender": self.sender,
+                "tx_type": self.tx_type,
+            })
+            object.__setattr__(self, "_body_cache", body)
+        return body
+
+    def hash_bytes(self) -> bytes:
+        digest = self._hash_cache
+        if digest is None:
+            digest = hashlib.sha256(self._body()).digest()
+            object.__setattr__(self, "_hash_cache", digest)
+        return digest
 
     def hash(self) -> str:
-        return hashlib.sha256(self._body()).hexdigest()
+        return self.hash_bytes().hex()
 
     # ---------- signing ----------
+    # The signed digest is SHA-256 of the body, i.e. hash_bytes(); passing it
+    # Prehashed yields the same signatures without hashing the body again.
     def sign(self, private_pem: str) -> None:
         priv = serialization.load_pem_private_key(private_pem.encode(), None)
-        sig = priv.sign(self._body(), ec.ECDSA(hashes.SHA256()))
+        sig = priv.sign(self.hash_bytes(), _ECDSA_PREHASHED)
         object.__setattr__(self, "signature", sig.hex())
 
     def verify(self) -> bool:
-        from cryptography.hazmat.primitives.asymmetric import ec
         if self.signature is None:
             return False
         try:
-            pub_bytes = bytes.fromhex(self.sender)
-            pub = ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256K1(), pub_bytes)
-            pub.verify(bytes.fromhex(self.signature), self._body(), ec.ECDSA(hashes.SHA256()))
+            _load_pub(self.sender).verify(bytes.fromhex(self.signature), self.hash_bytes(), _ECDSA_PREHASHED)
             return True
         except (ValueError, InvalidSignature):
             return False
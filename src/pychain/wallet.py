@@ -17,9 +17,9 @@ class Wallet:
 
     @classmethod
     def generate(cls) -> "Wallet": 
-        prive_pem, pub_hex = gen_keypari()
+        priv_pem, pub_hex = gen_keypair()
         return cls(
-            prive_pem=priv_pem, 
+            priv_pem=priv_pem, 
             pub_hex=pub_hex, 
             address=address_from_pub_hex(pub_hex),
         )
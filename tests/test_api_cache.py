@@ -0,0 +1,67 @@
+import hashlib
+import threading
+import time
+import types
+
+import orjson
+
+from src.pychain import api
+from src.pychain.api import _ReadCache
+from src.pychain.block import Block
+
+def _blocks(n, salt=b""):
+    return [Block(index=i, previous_hash=bytes(32), hash=hashlib.sha256(salt + bytes([i % 256, i // 256])).digest())
+            for i in range(n)]
+
+def test_chain_json_under_concurrent_reads_and_appends(monkeypatch):
+    # Yield the GIL on every encode so threads interleave inside the cache
+    def yielding_dumps(obj, *args, **kwargs):
+        time.sleep(0)
+        return orjson.dumps(obj, *args, **kwargs)
+    monkeypatch.setattr(api, "orjson", types.SimpleNamespace(dumps=yielding_dumps))
+
+    cache = _ReadCache()
+    full = _blocks(100)
+    chain = full[:1]
+    expected = [blk.hash.hex() for blk in full]
+    bad = []
+    start = threading.Barrier(5)
+
+    def reader():
+        start.wait()
+        for _ in range(100):
+            body = cache.chain_json(chain)
+            try:
+                hashes = orjson.loads(body)
+            except orjson.JSONDecodeError:
+                bad.append(body)
+                continue
+            if hashes != expected[:len(hashes)]:
+                bad.append(body)
+
+    def writer():
+        start.wait()
+        for blk in full[1:]:
+            chain.append(blk)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)] + [threading.Thread(target=writer)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not bad, f"{len(bad)} corrupt /chain bodies"
+    assert orjson.loads(cache.chain_json(chain)) == expected
+
+def test_replaced_chain_drops_cached_bodies():
+    cache = _ReadCache()
+    old_chain = _blocks(3)
+    cache.sync(old_chain)
+    for blk in old_chain:
+        cache.block_json(blk)
+    assert orjson.loads(cache.chain_json(old_chain)) == [blk.hash.hex() for blk in old_chain]
+
+    new_chain = _blocks(4, salt=b"fork")
+    cache.sync(new_chain)
+    assert cache.blocks == {}
+    assert orjson.loads(cache.chain_json(new_chain)) == [blk.hash.hex() for blk in new_chain]
@@ -0,0 +1,102 @@
+from src.pychain.block import merkle_root
+from src.pychain.blockchain import Blockchain
+from src.pychain.transaction import Transaction, gen_keypair
+
+def _pair():
+    # Miner and peer share genesis and a funded wallet
+    miner = Blockchain(use_pos=False, enable_reward=False)
+    peer = Blockchain(use_pos=False, enable_reward=False)
+    peer.chain[0] = miner.chain[0]
+    priv, pub = gen_keypair()
+    for node in (miner, peer):
+        node.accounts[pub] = {"balance": 100_000_000, "nonce": 0, "stake": 0}
+    return miner, peer, priv, pub
+
+def _signed(priv, pub, nonce, tx_type="PAY", amount=1_000, fee=10):
+    tx = Transaction(tx_type, pub, pub if tx_type == "PAY" else None, amount, fee, nonce)
+    tx.sign(priv)
+    return tx
+
+def test_peer_block_with_some_of_our_pending_txs():
+    miner, peer, priv, pub = _pair()
+    t1, t2, t3 = (_signed(priv, pub, n, fee=n) for n in (1, 2, 3))
+    for tx in (t1, t2):
+        assert miner.add_tx(tx)
+    for tx in (t1, t2, t3):
+        assert peer.add_tx(tx)
+
+    blk = miner.mine_block(miner_addr=pub)
+    assert peer.add_block(blk)
+
+    # Included txs leave the mempool; the rest stays mineable with fresh totals
+    assert peer.pending == [t3]
+    assert peer.accounts[pub].nonce == 3
+    assert peer._pending_fees == t3.fee
+    assert peer._frontier.root() == merkle_root([t3.hash_bytes()])
+    assert peer._pending_frontier().root() == merkle_root([t3.hash_bytes()])
+    assert peer.mine_block(miner_addr=pub).transactions == [t3]
+
+def test_pending_tx_with_conflicting_nonce_is_dropped():
+    miner, peer, priv, pub = _pair()
+    t1 = _signed(priv, pub, 1)
+    rival = _signed(priv, pub, 1, tx_type="STAKE", amount=5_000, fee=7)   # same nonce, other tx
+    assert miner.add_tx(t1)
+    assert peer.add_tx(rival)
+
+    blk = miner.mine_block(miner_addr=pub)
+    assert peer.add_block(blk)
+
+    assert peer.pending == []
+    assert peer.accounts[pub].nonce == 1
+    assert peer._pending_fees == 0
+    assert peer._pending_stake == {}
+    assert peer._frontier.count == 0
+    assert peer.add_tx(_signed(priv, pub, 2))
+
+def test_nonces_after_replace_chain():
+    miner = Blockchain(use_pos=False, enable_reward=True)
+    fresh = Blockchain(use_pos=False, enable_reward=True)
+    fresh.chain[0] = miner.chain[0]
+    priv, pub = gen_keypair()
+
+    # The chain must replay from genesis: block 1 carries a zero PAY plus the
+    # reward, and block 2 spends that reward
+    assert miner.add_tx(_signed(priv, pub, 1, amount=0, fee=0))
+    miner.mine_block(miner_addr=pub)
+    assert miner.add_tx(_signed(priv, pub, 2))
+    miner.mine_block(miner_addr=pub)
+
+    assert fresh.replace_chain(miner.chain)
+    assert fresh.pending == []
+    assert fresh.accounts[pub].nonce == 2
+    assert not fresh.add_tx(_signed(priv, pub, 2))
+    assert fresh.add_tx(_signed(priv, pub, 3))
+
+def _rejected_leaves_state(peer, blk, pub):
+    before = (list(peer.chain), peer.accounts[pub].copy(), list(peer.pending))
+    assert not peer.add_block(blk)
+    assert (peer.chain, peer.accounts[pub], peer.pending) == before
+
+def test_add_block_rejects_wrong_prev():
+    miner, peer, priv, pub = _pair()
+    assert miner.add_tx(_signed(priv, pub, 1))
+    blk = miner.mine_block(miner_addr=pub)
+    blk.previous_hash = bytes(32)
+    _rejected_leaves_state(peer, blk, pub)
+
+def test_add_block_rejects_wrong_index():
+    miner, peer, priv, pub = _pair()
+    assert miner.add_tx(_signed(priv, pub, 1))
+    blk = miner.mine_block(miner_addr=pub)
+    blk.index += 1
+    _rejected_leaves_state(peer, blk, pub)
+
+def test_add_block_rejects_block_failing_validation():
+    miner, peer, priv, pub = _pair()
+    assert miner.add_tx(_signed(priv, pub, 1))
+    assert peer.add_tx(_signed(priv, pub, 1, fee=11))      # our own pending tx survives
+    miner.accounts[pub].balance = 10**12                   # miner thinks the sender is rich
+    assert miner.add_tx(_signed(priv, pub, 2, amount=10**11))
+    blk = miner.mine_block(miner_addr=pub)
+    assert not peer.validate_block(blk, peer.chain[-1])
+    _rejected_leaves_state(peer, blk, pub)
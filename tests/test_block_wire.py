@@ -0,0 +1,62 @@
+import pytest
+
+from src.pychain.block import Block
+from src.pychain.blockchain import Blockchain
+
+def _wire(**overrides):
+    bc = Blockchain(use_pos=False, enable_reward=False)
+    data = bc.chain[0].to_dict()
+    data.update(index=1, previous_hash=bc.chain[0].hash.hex())
+    data.update(overrides)
+    return bc, data
+
+@pytest.mark.parametrize("field", ["previous_hash", "merkle_root", "hash"])
+@pytest.mark.parametrize("value", ["zz" * 32, "ab" * 33, 7, None])
+def test_bad_digest_hex_is_rejected(field, value):
+    _, data = _wire(**{field: value})
+    with pytest.raises(ValueError):
+        Block.from_dict(data)
+
+@pytest.mark.parametrize("drop", ["index", "transactions", "hash"])
+def test_missing_field_is_rejected(drop):
+    _, data = _wire()
+    del data[drop]
+    with pytest.raises(ValueError):
+        Block.from_dict(data)
+
+def test_slash_evidence_with_bad_hex_is_not_valid():
+    bc, good = _wire()
+    _, bad = _wire(hash="not hex")
+    payload = {"offender": "someone", "block_a": good, "block_b": bad}
+    assert bc._valid_slash_evidence(payload, bc.accounts) is False
+
+@pytest.mark.parametrize("field", ["index", "timestamp", "nonce"])
+@pytest.mark.parametrize("value", [-1, 2**64, "1", None, True])
+def test_header_int_out_of_range_is_rejected(field, value):
+    _, data = _wire(**{field: value})
+    with pytest.raises(ValueError):
+        Block.from_dict(data)
+
+@pytest.mark.parametrize("field", ["index", "nonce"])
+def test_float_index_or_nonce_is_rejected(field):
+    _, data = _wire(**{field: 1.0})
+    with pytest.raises(ValueError):
+        Block.from_dict(data)
+
+# Float seconds are a legacy timestamp form, so only unusable floats are refused
+@pytest.mark.parametrize("value", [float("inf"), float("nan"), -1.0])
+def test_bad_float_timestamp_is_rejected(value):
+    _, data = _wire(timestamp=value)
+    with pytest.raises(ValueError):
+        Block.from_dict(data)
+
+def test_slash_evidence_with_out_of_range_nonce_is_not_valid():
+    bc, good = _wire()
+    _, bad = _wire(nonce=2**64)
+    payload = {"offender": "someone", "block_a": good, "block_b": bad}
+    assert bc._valid_slash_evidence(payload, bc.accounts) is False
+
+def test_largest_header_values_still_decode():
+    _, data = _wire(index=2**64 - 1, nonce=2**64 - 1, timestamp=0)
+    blk = Block.from_dict(data)
+    assert len(blk.header_bytes()) == 88
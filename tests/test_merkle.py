@@ -0,0 +1,24 @@
+import hashlib
+
+from src.pychain.block import MerkleFrontier, merkle_root
+
+def test_frontier_matches_full_merkle_root():
+    leaves = [hashlib.sha256(str(i).encode()).digest() for i in range(33)]
+
+    # Every prefix length covers the odd-layer duplication rule at several heights
+    for n in range(len(leaves) + 1):
+        frontier = MerkleFrontier()
+        for leaf in leaves[:n]:
+            frontier.append(leaf)
+        assert frontier.root() == merkle_root(leaves[:n]), f"mismatch at {n} leaves"
+
+def test_frontier_copy_is_independent():
+    frontier = MerkleFrontier()
+    frontier.append(hashlib.sha256(b"a").digest())
+    snapshot = frontier.root()
+
+    clone = frontier.copy()
+    clone.append(hashlib.sha256(b"b").digest())
+
+    assert frontier.root() == snapshot
+    assert clone.root() != snapshot
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import time
+
+import orjson
+import websockets
+
+from src.pychain import blockchain, p2p
+from src.pychain.blockchain import Account, Blockchain
+from src.pychain.p2p import P2PNode
+from src.pychain.transaction import Transaction, gen_keypair
+
+def _run(coro):
+    return asyncio.run(asyncio.wait_for(coro, timeout=10))
+
+async def _serve(node):
+    return await websockets.serve(node.handler, "localhost", 0)
+
+def test_bad_message_does_not_end_the_link():
+    async def scenario():
+        server_node = P2PNode(port=0, peers=[])
+        server = await _serve(server_node)
+        uri = f"ws://localhost:{server.sockets[0].getsockname()[1]}"
+        try:
+            async with websockets.connect(uri) as ws:
+                await ws.send(b"{not json")
+                await ws.send(b'{"type": "faucet"}')                 # missing payload
+                await ws.send(orjson.dumps({"type": "faucet", "payload": {"address": "addr", "amount": 5}}))
+                for _ in range(100):
+                    if "addr" in server_node.blockchain.accounts:
+                        break
+                    await asyncio.sleep(0.01)
+            assert server_node.blockchain.accounts["addr"].balance == 5
+        finally:
+            server.close()
+            await server.wait_closed()
+    _run(scenario())
+
+def test_reader_exit_closes_and_forgets_peer_socket():
+    async def scenario():
+        node = P2PNode(port=0, peers=[])
+        server = await _serve(P2PNode(port=0, peers=[]))
+        uri = f"ws://localhost:{server.sockets[0].getsockname()[1]}"
+
+        async def broken_handler(ws, path=None):
+            raise RuntimeError("boom")
+        node.handler = broken_handler
+        try:
+            ws = await node._get_ws(uri)
+            for _ in range(100):
+                if uri not in node._peer_ws:
+                    break
+                await asyncio.sleep(0.01)
+            assert uri not in node._peer_ws
+            await ws.wait_closed()
+        finally:
+            server.close()
+            await server.wait_closed()
+    _run(scenario())
+
+def _recording_node(monkeypatch):
+    node = P2PNode(port=0, peers=[])
+    sent = []
+    async def record(kind, obj):
+        sent.append((kind, obj))
+    monkeypatch.setattr(node, "broadcast", record)
+    return node, sent
+
+def test_tx_batch_flushes_after_delay(monkeypatch):
+    async def scenario():
+        node, sent = _recording_node(monkeypatch)
+        for n in range(3):
+            node._queue_tx({"n": n})
+        await asyncio.sleep(0)
+        assert sent == []                               # still waiting on call_later
+        await asyncio.sleep(p2p.TX_BATCH_DELAY * 4)
+        assert sent == [("tx_batch", [{"n": 0}, {"n": 1}, {"n": 2}])]
+        assert node._tx_outbox == [] and node._tx_flush is None
+
+        node._queue_tx({"n": 3})                        # a lone tx goes out as plain "tx"
+        await asyncio.sleep(p2p.TX_BATCH_DELAY * 4)
+        assert sent[-1] == ("tx", {"n": 3})
+    _run(scenario())
+
+def test_tx_batch_flushes_when_full(monkeypatch):
+    monkeypatch.setattr(p2p, "TX_BATCH_SIZE", 2)
+    async def scenario():
+        node, sent = _recording_node(monkeypatch)
+        node._queue_tx({"n": 0})
+        node._queue_tx({"n": 1})
+        await asyncio.sleep(0)
+        assert sent == [("tx_batch", [{"n": 0}, {"n": 1}])]
+        assert node._tx_flush is None                   # pending timer was cancelled
+    _run(scenario())
+
+def test_seen_set_suppresses_duplicates_across_eviction(monkeypatch):
+    monkeypatch.setattr(p2p, "SEEN_CACHE_SIZE", 2)
+    async def scenario():
+        node = P2PNode(port=0, peers=[])
+        processed = []
+        monkeypatch.setattr(node.blockchain, "add_tx", lambda tx: processed.append(tx.nonce) or False)
+
+        def msg(nonce):
+            return orjson.dumps({"type": "tx", "payload": {
+                "tx_type": "PAY", "sender": "s", "recipient": "r", "amount": 1, "fee": 0, "nonce": nonce}})
+
+        for nonce in (1, 2, 1, 3, 1, 2):
+            await node._on_message(None, msg(nonce))
+        # 1 is refreshed by its repeat, so 3 evicts 2; 1 stays suppressed, 2 is new again
+        assert processed == [1, 2, 3, 2]
+        assert len(node._seen) == 2
+    _run(scenario())
+
+def test_integers_beyond_64_bits_survive_gossip(monkeypatch):
+    async def scenario():
+        node = P2PNode(port=0, peers=[])
+        received = []
+        monkeypatch.setattr(node.blockchain, "add_tx", lambda tx: received.append(tx) or False)
+        priv, pub = gen_keypair()
+        tx = Transaction("PAY", pub, pub, 1, 0, 1, payload={"a": 2**64, "b": 10**23, "c": -2**63 - 1})
+        tx.sign(priv)
+        data = {"type": "tx", "payload": tx.to_dict()}
+
+        # orjson refuses to encode these ints and would decode them as floats
+        frame = p2p._dumps(data)
+        assert p2p._loads(frame) == data
+        await node._on_message(None, frame)
+        await node._on_message(None, json.dumps(data))          # text frame from an older node
+        assert [got.payload for got in received] == [tx.payload] * 2
+        assert all(got.verify() for got in received)
+    _run(scenario())
+
+def _pay(node, nonce):
+    tx = Transaction("PAY", node.miner_addr, node.miner_addr, 1_000, 10, nonce)
+    tx.sign(node.priv_key)
+    return tx
+
+def test_mining_runs_off_the_loop(monkeypatch):
+    real = blockchain._search_nonce
+    def slow(*args):
+        time.sleep(0.05)
+        return real(*args)
+    monkeypatch.setattr(blockchain, "_search_nonce", slow)
+    async def scenario():
+        node, sent = _recording_node(monkeypatch)
+        assert node.blockchain.add_tx(_pay(node, 1))
+        mining = asyncio.create_task(node._mine_once())
+        ticks = 0
+        while not mining.done():                        # the loop keeps turning during the search
+            ticks += 1
+            await asyncio.sleep(0.001)
+        await mining
+        assert ticks > 5
+        assert node.blockchain.chain[-1].index == 1 and node.blockchain.pending == []
+        assert [kind for kind, _ in sent] == ["block"]
+    _run(scenario())
+
+def test_peer_block_stops_the_nonce_search(monkeypatch):
+    async def scenario():
+        node, sent = _recording_node(monkeypatch)
+        peer = Blockchain(use_pos=False, enable_reward=True)
+        peer.chain[0] = node.blockchain.chain[0]
+        peer.accounts[node.miner_addr] = Account(balance=100_000_000)
+        tx = _pay(node, 1)
+        for bc in (node.blockchain, peer):
+            assert bc.add_tx(tx)
+        peer_blk = peer.mine_block(miner_addr="somebody else")
+
+        # Our own search never hits; it only ends when told to
+        spans = []
+        def no_hit(prefix, target, start, stop=None):
+            spans.append(start)
+            time.sleep(0.001)
+        monkeypatch.setattr(blockchain, "_search_nonce", no_hit)
+        mining = asyncio.create_task(node._mine_once())
+        while not spans:
+            await asyncio.sleep(0.001)
+
+        await node._on_message(None, p2p._dumps({"type": "block", "payload": peer_blk.to_dict()}))
+        await mining
+        assert node.blockchain.chain[-1].hash == peer_blk.hash
+        assert node.blockchain.pending == [] and sent == []
+    _run(scenario())
@@ -55,3 +55,50 @@ def test_remit_roundtrip():
     # 4) Verify Bob received the funds and the contract is marked released
     assert bc.accounts[pubB]["balance"] == 5_000_000
     assert bc.remits[rid].released is True
+
+
+def test_peer_accepts_claim_block():
+    # A second node replaying the same blocks must accept a correct claim
+    bc = Blockchain()
+    peer = Blockchain()
+    peer.chain[0] = bc.chain[0]
+    privA, pubA = gen_keypair()
+    privB, pubB = gen_keypair()
+    for node in (bc, peer):
+        node.accounts[pubA] = {"balance": 10_000_000, "nonce": 0, "stake": 0}
+
+    code = "secret123"
+    rid = secrets.token_hex(8)
+    open_tx = Transaction(
+        tx_type="OPEN_REMIT",
+        sender=pubA,
+        recipient=None,
+        amount=5_000_000,
+        fee=1_000,
+        nonce=1,
+        payload={"id": rid, "recipient": pubB, "release_hash": hashlib.sha256(code.encode()).hexdigest()},
+    )
+    open_tx.sign(privA)
+    assert bc.add_tx(open_tx)
+    blk1 = bc.mine_block(miner_addr=pubA)
+    assert peer.validate_block(blk1, peer.chain[-1])
+    peer._apply_block(blk1)
+    peer.chain.append(blk1)
+
+    claim_tx = Transaction(
+        tx_type="CLAIM_REMIT",
+        sender=pubB,
+        recipient=None,
+        amount=0,
+        fee=0,
+        nonce=1,
+        payload={"id": rid, "release_code": code},
+    )
+    claim_tx.sign(privB)
+    assert bc.add_tx(claim_tx)
+    blk2 = bc.mine_block(miner_addr=pubB)
+    assert peer.validate_block(blk2, peer.chain[-1])
+    assert peer.remits[rid].released is False   # validation must not touch live state
+    peer._apply_block(blk2)
+    assert peer.accounts[pubB]["balance"] == 5_000_000
+    assert peer.remits[rid].released is True
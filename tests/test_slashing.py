@@ -1,5 +1,7 @@
 import pytest
+from src.pychain.block import Block, merkle_root
 from src.pychain.blockchain import Blockchain
+from src.pychain.config import REWARD_SENDER, REWARD_SIGNATURE
 from src.pychain.transaction import Transaction, gen_keypair
 
 def test_double_signing_is_slashed():
@@ -35,3 +37,57 @@ def test_double_signing_is_slashed():
     # After double-sign, half their stake is gone
     remaining = bc.accounts[pub]["stake"]
     assert remaining == 10_000_000, f"Expected stake to be halved, got {remaining}"
+
+def _evidence_block(parent, offender, salt):
+    # A competing block at parent.index + 1 paying its reward to `offender`
+    reward = Transaction("PAY", REWARD_SENDER, offender, salt, 0, 0, signature=REWARD_SIGNATURE)
+    blk = Block(index=parent.index + 1, previous_hash=parent.hash, transactions=[reward])
+    blk.merkle_root = merkle_root([reward.hash_bytes()])
+    blk.hash = blk.compute_hash()
+    return blk.to_dict()
+
+def test_peer_accepts_slash_block():
+    miner = Blockchain(use_pos=True, enable_reward=False)
+    peer = Blockchain(use_pos=True, enable_reward=False)
+    peer.chain[0] = miner.chain[0]
+    priv, pub = gen_keypair()
+    rep_priv, reporter = gen_keypair()
+    for node in (miner, peer):
+        node.accounts[pub] = {"balance": 100_000_000, "nonce": 0, "stake": 0}
+        node.accounts[reporter] = {"balance": 0, "nonce": 0, "stake": 0}
+
+    stake_tx = Transaction("STAKE", pub, None, 20_000_000, 0, 1)
+    stake_tx.sign(priv)
+    assert miner.add_tx(stake_tx)
+    blk1 = miner.mine_block(miner_addr=pub)
+    assert peer.validate_block(blk1, peer.chain[-1])
+    peer._apply_block(blk1)
+    peer.chain.append(blk1)
+
+    # Evidence: two different blocks for height 2, both crediting the only staker
+    parent = miner.chain[-1]
+    slash_tx = Transaction("SLASH", reporter, None, 0, 0, 1, payload={
+        "offender": pub,
+        "block_a": _evidence_block(parent, pub, 1),
+        "block_b": _evidence_block(parent, pub, 2),
+    })
+    slash_tx.sign(rep_priv)
+    assert miner.add_tx(slash_tx)
+    blk2 = miner.mine_block(miner_addr=pub)
+    assert miner.accounts[pub].stake == 10_000_000
+
+    assert peer.validate_block(blk2, peer.chain[-1]), "peer must accept a block carrying valid slash evidence"
+    peer._apply_block(blk2)
+    assert peer.accounts[pub].stake == 10_000_000
+
+def test_slash_evidence_from_different_heights_is_rejected():
+    bc = Blockchain(use_pos=True, enable_reward=False)
+    priv, pub = gen_keypair()
+    bc.accounts[pub] = {"balance": 0, "nonce": 0, "stake": 20_000_000}
+    parent = bc.chain[-1]
+    block_a = _evidence_block(parent, pub, 1)
+    block_b = dict(_evidence_block(parent, pub, 2), index=parent.index + 2)
+    payload = {"offender": pub, "block_a": block_a, "block_b": block_b}
+    assert bc._valid_slash_evidence(payload, bc.accounts) is False
+    payload["block_b"] = _evidence_block(parent, pub, 2)
+    assert bc._valid_slash_evidence(payload, bc.accounts) is True
@@ -0,0 +1,65 @@
+import itertools
+import json
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from src.pychain.config import JSON_SEP
+from src.pychain.transaction import Transaction, _canonical, gen_keypair
+
+def _reference(body):
+    return json.dumps(body, sort_keys=True, separators=JSON_SEP).encode()
+
+def test_canonical_body_matches_json_dumps():
+    # Body bytes are hashed and signed: the orjson route must never differ from json
+    odd = [None, "PAY", "é", "\x7f", "\x00\"\\", 1, -1, 2**64, True, 1.5, 1e16, float("nan"), float("inf"), [1e16], {"k": 1e16}]
+    base = {"amount": 5, "fee": 1, "nonce": 3, "payload": None,
+            "recipient": "cd" * 65, "sender": "ab" * 65, "tx_type": "PAY"}
+    assert _canonical(base) == _reference(base)
+    for key, value in itertools.product(base, odd):
+        body = dict(base, **{key: value})
+        assert _canonical(body) == _reference(body), f"{key}={value!r}"
+
+    for payload in ({}, {"id": "x", "release_hash": "ab" * 32}, {"id": 1e16}, {"a": {"b": float("nan")}}, {"é": "x"}):
+        body = dict(base, payload=payload)
+        assert _canonical(body) == _reference(body), f"payload={payload!r}"
+
+def test_nan_recipient_does_not_collide_with_none():
+    none_tx = Transaction("PAY", "ab", None, 1, 0, 1)
+    nan_tx = Transaction("PAY", "ab", float("nan"), 1, 0, 1)
+    assert none_tx.hash() != nan_tx.hash()
+
+def _legacy_pair():
+    priv_pem, pub_hex = gen_keypair()
+    priv = serialization.load_pem_private_key(priv_pem.encode(), None)
+    pub = ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256K1(), bytes.fromhex(pub_hex))
+    return priv_pem, pub_hex, priv, pub
+
+def test_prehashed_signatures_match_plain_ecdsa_sha256():
+    priv_pem, pub_hex, priv, pub = _legacy_pair()
+    tx = Transaction("PAY", pub_hex, pub_hex, 10, 1, 1)
+
+    # New sign -> old verify: ECDSA(SHA256) over the body
+    tx.sign(priv_pem)
+    pub.verify(bytes.fromhex(tx.signature), tx._body(), ec.ECDSA(hashes.SHA256()))
+
+    # Old sign -> new verify
+    legacy = Transaction("PAY", pub_hex, pub_hex, 10, 1, 1)
+    sig = priv.sign(legacy._body(), ec.ECDSA(hashes.SHA256()))
+    object.__setattr__(legacy, "signature", sig.hex())
+    assert legacy.verify()
+
+def test_tampered_transaction_fails_verify():
+    priv_pem, pub_hex = gen_keypair()
+    tx = Transaction("PAY", pub_hex, pub_hex, 10, 1, 1)
+    tx.sign(priv_pem)
+    assert tx.verify()
+
+    data = tx.to_dict()
+    assert not Transaction.from_dict(dict(data, amount=11)).verify()
+    assert not Transaction.from_dict(dict(data, nonce=2)).verify()
+    flipped = data["signature"][:-2] + ("00" if data["signature"][-2:] != "00" else "01")
+    assert not Transaction.from_dict(dict(data, signature=flipped)).verify()
+    _, other_pub = gen_keypair()
+    assert not Transaction.from_dict(dict(data, sender=other_pub)).verify()
+    assert not Transaction.from_dict(dict(data, signature=None)).verify()
@@ -0,0 +1,60 @@
+import pytest
+
+from src.pychain.block import Block, merkle_root
+from src.pychain.blockchain import Blockchain
+from src.pychain.config import MAX_AMOUNT
+from src.pychain.transaction import Transaction, gen_keypair
+
+def _chain():
+    # PoS without rewards: hand-built blocks need no PoW or validator slot
+    bc = Blockchain(use_pos=True, enable_reward=False)
+    priv, pub = gen_keypair()
+    bc.accounts[pub] = {"balance": 2**70, "nonce": 0, "stake": 0}
+    return bc, priv, pub
+
+def _signed(priv, pub, tx_type="PAY", amount=1_000, fee=10, payload=None):
+    tx = Transaction(tx_type, pub, pub if tx_type == "PAY" else None, amount, fee, 1, payload=payload)
+    tx.sign(priv)
+    return tx
+
+def _block(bc, txs):
+    prev = bc.chain[-1]
+    blk = Block(index=prev.index + 1, previous_hash=prev.hash, transactions=txs)
+    blk.merkle_root = merkle_root([tx.hash_bytes() for tx in txs])
+    blk.hash = blk.compute_hash()
+    return blk
+
+def _admitted_and_validated(make_tx):
+    # add_tx and validate_block must agree
+    bc, priv, pub = _chain()
+    tx = make_tx(priv, pub)
+    in_block = bc.validate_block(_block(bc, [tx]), bc.chain[-1])
+    return bc.add_tx(tx), in_block
+
+def test_sane_amount_is_accepted():
+    assert _admitted_and_validated(lambda priv, pub: _signed(priv, pub)) == (True, True)
+
+@pytest.mark.parametrize("amount, fee", [
+    (1_000, -5),                    # negative fee would mint to the sender
+    (MAX_AMOUNT + 1, 0),
+    (1_000, MAX_AMOUNT + 1),
+    (MAX_AMOUNT, 1),                # amount + fee overflows the 64-bit field
+    (True, 0),
+    (1_000, False),
+    (1_000.0, 0),
+    (1_000, 0.5),
+])
+def test_bad_amount_or_fee_is_rejected(amount, fee):
+    result = _admitted_and_validated(lambda priv, pub: _signed(priv, pub, amount=amount, fee=fee))
+    assert result == (False, False)
+
+def _open_remit(release_hash):
+    return lambda priv, pub: _signed(priv, pub, tx_type="OPEN_REMIT", amount=5_000,
+                                     payload={"id": "r1", "recipient": pub, "release_hash": release_hash})
+
+def test_open_remit_with_valid_release_hash_is_accepted():
+    assert _admitted_and_validated(_open_remit("ab" * 32)) == (True, True)
+
+@pytest.mark.parametrize("release_hash", [None, "", "ab" * 31, "ab" * 33, "zz" * 32, 123, ["ab" * 32]])
+def test_open_remit_with_malformed_release_hash_is_rejected(release_hash):
+    assert _admitted_and_validated(_open_remit(release_hash)) == (False, False)
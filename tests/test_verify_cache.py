@@ -0,0 +1,63 @@
+from src.pychain import blockchain
+from src.pychain.blockchain import Blockchain
+from src.pychain.transaction import Transaction, gen_keypair
+
+def _signed(priv, pub, nonce=1):
+    tx = Transaction("PAY", pub, pub, 10, 1, nonce)
+    tx.sign(priv)
+    return tx
+
+def _count_verifies(monkeypatch):
+    calls = []
+    real = Transaction.verify
+    def counting(tx):
+        calls.append(tx)
+        return real(tx)
+    monkeypatch.setattr(Transaction, "verify", counting)
+    return calls
+
+def test_cache_hit_skips_second_verify(monkeypatch):
+    calls = _count_verifies(monkeypatch)
+    bc = Blockchain()
+    priv, pub = gen_keypair()
+    tx = _signed(priv, pub)
+
+    assert bc._verify_cached(tx)
+    # A fresh object for the same signed tx (as decoded from a peer) hits the cache
+    assert bc._verify_cached(Transaction.from_dict(tx.to_dict()))
+    assert len(calls) == 1
+
+def test_forged_signature_on_same_body_is_rejected(monkeypatch):
+    calls = _count_verifies(monkeypatch)
+    bc = Blockchain()
+    priv, pub = gen_keypair()
+    other_priv, _ = gen_keypair()
+    tx = _signed(priv, pub)
+    assert bc._verify_cached(tx)
+
+    forged = Transaction("PAY", pub, pub, 10, 1, 1)
+    forged.sign(other_priv)                     # same body, someone else's key
+    assert forged.hash_bytes() == tx.hash_bytes()
+    assert not bc._verify_cached(forged)
+    assert not bc._verify_cached(forged)        # the negative result is cached too
+    assert len(calls) == 2
+
+def test_lru_eviction_at_capacity(monkeypatch):
+    monkeypatch.setattr(blockchain, "VERIFY_CACHE_SIZE", 2)
+    calls = _count_verifies(monkeypatch)
+    bc = Blockchain()
+    priv, pub = gen_keypair()
+    a, b, c = (_signed(priv, pub, n) for n in (1, 2, 3))
+
+    for tx in (a, b):
+        bc._verify_cached(tx)
+    bc._verify_cached(a)                        # a becomes most recent; b is next out
+    bc._verify_cached(c)
+    assert len(bc._verify_cache) == 2
+    assert bc._verify_key(b) not in bc._verify_cache
+    assert bc._verify_key(a) in bc._verify_cache
+
+    del calls[:]
+    bc._verify_cached(b)                        # evicted -> verified again
+    bc._verify_cached(c)                        # still cached
+    assert calls == [b]